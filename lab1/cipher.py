@@ -1,142 +1,767 @@
-import random
+import base64
+import functools
+import math
+import secrets
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
+from labs.alphabet import from_codepoints, to_codepoints
 
-class SinglePermutationCipher:
-    def __init__(self):
-        pass
 
-    def encrypt(self, text):
-        key = list(range(1, len(text) + 1))
-        random.shuffle(key)
+# Генератор випадкових перестановок для всіх шифрів модуля
+_rng = np.random.default_rng()
 
-        encrypted_text = [""] * len(text)
-        for original_index, new_index in enumerate(key, 1):
-            encrypted_text[new_index - 1] = text[original_index - 1]
 
-        encrypted_text = "".join(encrypted_text)
-        key = "-".join(str(i) for i in key)
+def _index_dtype(length):
+    """Повертає найменший беззнаковий тип, у який вміщуються індекси 0..length-1."""
+    if length <= 1 << 8:
+        return np.dtype("<u1")
+    if length <= 1 << 16:
+        return np.dtype("<u2")
+    return np.dtype("<u4")
 
-        return encrypted_text, key
 
-    def decrypt(self, encrypted_text, key):
-        decrypted_text = [""] * len(encrypted_text)
-        key = [int(i) for i in key.split("-")]
-        for new_index, original_index in enumerate(key):
-            decrypted_text[new_index] = encrypted_text[original_index - 1]
+def _random_permutations(count, length):
+    """Генерує count незалежних випадкових перестановок довжини length (по рядках)."""
+    identity = np.broadcast_to(np.arange(length), (count, length))
+    return _rng.permuted(identity, axis=1)
+
+
+def _stack_rows(texts):
+    """Перетворює список рядків однакової довжини на двовимірний масив кодів."""
+    codes = to_codepoints("".join(texts))
+    return codes.reshape(len(texts), -1) if len(texts) else codes.reshape(0, 0)
+
+
+def _split_rows(codes):
+    """Перетворює двовимірний масив кодів на список рядків (по одному на рядок масиву)."""
+    count, width = codes.shape
+    text = from_codepoints(codes)
+    return [text[i * width : (i + 1) * width] for i in range(count)]
+
+
+def _encrypt_one(cipher_class, item, options):
+    return cipher_class().encrypt(*item, **options)
+
+
+def _decrypt_one(cipher_class, item, options):
+    return cipher_class().decrypt(*item, **options)
+
+
+class _BatchMixin:
+    """
+    Пакетне шифрування та розшифрування.
+
+    Повідомлення групуються за формою (довжиною); кожна група доповнюється
+    до двовимірного масиву й переставляється однією операцією NumPy.
+    Повідомлення, що не мають пари, обробляються поодинці, а якщо їх
+    багато - у пулі процесів.
+    """
+
+    # Кількість поодиноких повідомлень, з якої вмикається пул процесів
+    POOL_THRESHOLD = 256
+
+    def encrypt_many(self, messages, **options):
+        items = [(message,) for message in messages]
+        groups = defaultdict(list)
+        for i, message in enumerate(messages):
+            groups[self._encrypt_group_key(message, **options)].append(i)
+        return self._run_batch(items, groups, self._encrypt_group, _encrypt_one, options)
 
-        decrypted_text = "".join(decrypted_text)
+    def decrypt_many(self, ciphertexts, keys):
+        items = list(zip(ciphertexts, keys))
+        groups = defaultdict(list)
+        for i, (ciphertext, key) in enumerate(items):
+            groups[self._decrypt_group_key(ciphertext, key)].append(i)
+        return self._run_batch(items, groups, self._decrypt_group, _decrypt_one, {})
 
-        return decrypted_text
+    def _run_batch(self, items, groups, group_function, one_function, options):
+        results = [None] * len(items)
 
+        ragged = []
+        for group_key, indices in groups.items():
+            # Ключ None означає, що елемент не можна обробити разом з іншими
+            if group_key is None or len(indices) == 1:
+                ragged.extend(indices)
+                continue
+            columns = zip(*(items[i] for i in indices))
+            for i, result in zip(indices, group_function(*columns, **options)):
+                results[i] = result
+
+        ragged_items = [items[i] for i in ragged]
+        if len(ragged_items) >= self.POOL_THRESHOLD:
+            worker = functools.partial(one_function, type(self), options=options)
+            with ProcessPoolExecutor() as pool:
+                done = list(pool.map(worker, ragged_items, chunksize=64))
+        else:
+            done = [one_function(type(self), item, options) for item in ragged_items]
+
+        for i, result in zip(ragged, done):
+            results[i] = result
+        return results
+
+
+class SinglePermutationCipher(_BatchMixin):
+    # Розмір блоку за замовчуванням для режиму з ключем-зерном
+    DEFAULT_BLOCK_SIZE = 1 << 16
 
-class RoutePermutationCipher:
     def __init__(self):
         pass
 
-    def generate_route(self):
-        indices = [0, 1, 2, 3]
-        random.shuffle(indices)
-        return indices
+    def encrypt(self, text, block_size=None):
+        # Якщо заданий розмір блоку, ключ має сталий розмір (зерно + блок)
+        if block_size is not None:
+            key = self.generate_seeded_key(block_size)
+            return "".join(self.encrypt_stream(text, key)), key
 
-    def encrypt(self, text):
-        text = text.replace(" ", "_")
-        blocks = [text[i:i+4].ljust(4, "_") for i in range(0, len(text), 4)]
+        codes = to_codepoints(text)
 
-        route = self.generate_route()
-        key = "".join(str(i) for i in route)
-        encrypted_text = ""
-        for pos in route:
-            encrypted_text += "".join(block[pos] for block in blocks)
+        # i-й символ шифрограми береться з позиції key[i] відкритого тексту
+        key = _rng.permutation(len(codes)).astype(_index_dtype(len(codes)))
+        encrypted_text = from_codepoints(codes[key])
 
-        return encrypted_text, key
+        return encrypted_text, self.pack_key(key)
 
     def decrypt(self, encrypted_text, key):
-        # Determine number of blocks
-        key = [int(i) for i in key]
-        num_blocks = len(encrypted_text) // len(key)
-        blocks = [["" for _ in range(len(key))] for _ in range(num_blocks)]
-
-        # Extract segments and place them according to the route
-        for i, pos in enumerate(key):
-            segment = encrypted_text[i * num_blocks:(i + 1) * num_blocks]
-            for j in range(num_blocks):
-                blocks[j][pos] = segment[j]
-
-        # Combine blocks and format
-        decrypted_text = "".join("".join(block) for block in blocks)
-        return decrypted_text.replace("_", " ").strip()
-
+        if self._is_seeded_key(key):
+            return "".join(self.decrypt_stream(encrypted_text, key))
+
+        codes = to_codepoints(encrypted_text)
+
+        # Ключі старого формату ("3-1-2") підтримуємо для сумісності
+        if self._is_legacy_key(key):
+            key = np.array(key.split("-"), dtype=np.int64) - 1
+            return from_codepoints(codes[key])
+
+        # Обернена перестановка як одна операція розсіювання (без argsort)
+        key = self.unpack_key(key, len(codes))
+        decrypted = np.empty_like(codes)
+        decrypted[key] = codes
+
+        return from_codepoints(decrypted)
+
+    def encrypt_stream(self, source, key):
+        """
+        Шифрує текст поблоково, повертаючи генератор зашифрованих блоків.
+
+        :param source: Рядок, ітерабельний об'єкт рядків або текстовий файл
+        :param key: Ключ вигляду "зерно:розмір_блоку" (див. generate_seeded_key)
+        """
+        seed, block_size = self._parse_seeded_key(key)
+        for index, block in enumerate(self._blocks(source, block_size)):
+            codes = to_codepoints(block)
+            permutation = self._block_permutation(seed, index, len(codes))
+            yield from_codepoints(codes[permutation])
+
+    def decrypt_stream(self, source, key):
+        """Розшифровує поблоково текст, зашифрований encrypt_stream."""
+        seed, block_size = self._parse_seeded_key(key)
+        for index, block in enumerate(self._blocks(source, block_size)):
+            codes = to_codepoints(block)
+            permutation = self._block_permutation(seed, index, len(codes))
+            decrypted = np.empty_like(codes)
+            decrypted[permutation] = codes
+            yield from_codepoints(decrypted)
+
+    @classmethod
+    def generate_seeded_key(cls, block_size=None):
+        """Генерує ключ сталого розміру: 64-бітне зерно та розмір блоку."""
+        if block_size is None:
+            block_size = cls.DEFAULT_BLOCK_SIZE
+        if block_size < 1:
+            raise ValueError("Розмір блоку повинен бути додатним")
+        return f"{secrets.randbits(64):016x}:{block_size}"
+
+    @staticmethod
+    def _parse_seeded_key(key):
+        seed, block_size = key.split(":")
+        return int(seed, 16), int(block_size)
+
+    @staticmethod
+    def _block_permutation(seed, index, length):
+        # Перестановка Фішера-Єйтса від генератора, ключованого (зерно, номер блоку)
+        return np.random.default_rng([seed, index]).permutation(length)
+
+    @staticmethod
+    def _blocks(source, block_size):
+        """Розбиває джерело на блоки рівно block_size символів (останній коротший)."""
+        if isinstance(source, str):
+            for i in range(0, len(source), block_size):
+                yield source[i : i + block_size]
+            return
+
+        if hasattr(source, "read"):
+            source = iter(lambda read=source.read: read(block_size), "")
+
+        buffer = ""
+        for chunk in source:
+            buffer += chunk
+            if len(buffer) < block_size:
+                continue
+            full = len(buffer) - len(buffer) % block_size
+            for i in range(0, full, block_size):
+                yield buffer[i : i + block_size]
+            buffer = buffer[full:]
+        if buffer:
+            yield buffer
+
+    @staticmethod
+    def pack_key(key):
+        """
+        Пакує перестановку в компактний рядок base64.
+
+        Розмір елемента (1, 2 або 4 байти) визначається довжиною повідомлення,
+        тому окремий заголовок у ключі не потрібен.
+        """
+        key = np.asarray(key)
+        key = key.astype(_index_dtype(len(key)), copy=False)
+        return base64.b64encode(key.tobytes()).decode("ascii")
+
+    @staticmethod
+    def unpack_key(key, length):
+        """Розпаковує ключ base64 у масив індексів для повідомлення довжини length."""
+        raw = base64.b64decode(key)
+        dtype = _index_dtype(length)
+        if len(raw) != length * dtype.itemsize:
+            raise ValueError("Ключ не відповідає довжині повідомлення")
+
+        key = np.frombuffer(raw, dtype=dtype)
+        if length and key.max() >= length:
+            raise ValueError("Ключ містить некоректні індекси")
+        return key
+
+    def _encrypt_group_key(self, text, block_size=None):
+        # У режимі з ключем-зерном кожне повідомлення шифрується окремо
+        if block_size is not None:
+            return None
+        return len(text)
+
+    def _encrypt_group(self, messages, block_size=None):
+        codes = _stack_rows(messages)
+        length = codes.shape[1]
+
+        keys = _random_permutations(len(messages), length)
+        encrypted = np.take_along_axis(codes, keys, axis=1)
+
+        return [
+            (encrypted_text, self.pack_key(key))
+            for encrypted_text, key in zip(_split_rows(encrypted), keys)
+        ]
+
+    def _decrypt_group_key(self, encrypted_text, key):
+        if self._is_seeded_key(key) or self._is_legacy_key(key):
+            return None
+        return len(encrypted_text)
+
+    def _decrypt_group(self, ciphertexts, keys):
+        codes = _stack_rows(ciphertexts)
+        count, length = codes.shape
+
+        dtype = _index_dtype(length)
+        raw = b"".join(base64.b64decode(key) for key in keys)
+        if len(raw) != count * length * dtype.itemsize:
+            raise ValueError("Ключ не відповідає довжині повідомлення")
+        keys = np.frombuffer(raw, dtype=dtype).reshape(count, length).astype(np.intp)
+        if length and keys.max() >= length:
+            raise ValueError("Ключ містить некоректні індекси")
+
+        decrypted = np.empty_like(codes)
+        np.put_along_axis(decrypted, keys, codes, axis=1)
+
+        return _split_rows(decrypted)
+
+    @staticmethod
+    def _is_legacy_key(key):
+        # У base64 немає "-", тож досить перевірити початок ключа; ключ старого
+        # формату без "-" ("1") коротший за будь-який ключ base64 (кратний 4)
+        return "-" in key[:32] or (0 < len(key) < 4 and key.isdigit())
+
+    @staticmethod
+    def _is_seeded_key(key):
+        return ":" in key
+
+
+@functools.lru_cache(maxsize=64)
+def _route_cells(route, rows, width):
+    """
+    Обчислює порядок обходу клітинок таблиці rows x width для маршруту.
+
+    Не залежить від порядку стовпців, тому кешується.
+
+    :return: Пара масивів (зсуви початків рядків row * width, номери стовпців)
+             у порядку читання.
+    """
+    if route in ("columns", "snake"):
+        cell_rows = np.tile(np.arange(rows), width)
+        cell_cols = np.repeat(np.arange(width), rows)
+        if route == "snake":
+            # Непарні стовпці читаємо знизу вгору
+            cell_rows = cell_rows.reshape(width, rows)
+            cell_rows[1::2] = cell_rows[1::2, ::-1]
+            cell_rows = cell_rows.ravel()
+    elif route == "diagonal":
+        grid_rows, grid_cols = np.indices((rows, width)).reshape(2, -1)
+        order = np.lexsort((grid_rows, grid_rows + grid_cols))
+        cell_rows, cell_cols = grid_rows[order], grid_cols[order]
+    elif route == "spiral":
+        cell_rows, cell_cols = [], []
+        top, bottom, left, right = 0, rows - 1, 0, width - 1
+        while top <= bottom and left <= right:
+            # Верхній рядок зліва направо, правий стовпець згори вниз
+            cell_rows += [top] * (right - left + 1)
+            cell_cols += range(left, right + 1)
+            cell_rows += range(top + 1, bottom + 1)
+            cell_cols += [right] * (bottom - top)
+            if top < bottom and left < right:
+                # Нижній рядок справа наліво, лівий стовпець знизу вгору
+                cell_rows += [bottom] * (right - left)
+                cell_cols += range(right - 1, left - 1, -1)
+                cell_rows += range(bottom - 1, top, -1)
+                cell_cols += [left] * (bottom - top - 1)
+            top, bottom, left, right = top + 1, bottom - 1, left + 1, right - 1
+        cell_rows = np.array(cell_rows, dtype=np.intp)
+        cell_cols = np.array(cell_cols, dtype=np.intp)
+    else:
+        raise ValueError(f"Невідомий маршрут: {route}")
+
+    row_offsets = cell_rows * width
+    row_offsets.flags.writeable = False
+    cell_cols.flags.writeable = False
+    return row_offsets, cell_cols
+
+
+def _route_forward(route, length, orders):
+    """
+    Будує пряму карту маршруту: шифрограма = текст[forward].
+
+    :param orders: Порядок стовпців (одновимірний) або по порядку на кожне
+                   повідомлення пакета (двовимірний масив)
+    """
+    orders = np.asarray(orders)
+    width = orders.shape[-1]
+    row_offsets, cell_cols = _route_cells(route, length // width, width)
+    return row_offsets + orders[..., cell_cols]
+
+
+class RoutePermutationCipher(_BatchMixin):
+    # Доступні маршрути обходу таблиці
+    ROUTES = ("columns", "snake", "spiral", "diagonal")
 
-class MultilevelCipher:
     def __init__(self):
         pass
 
-    def encrypt(self, text):
-        # Create blocks of 4 characters
-        blocks = []
-        for i in range(0, len(text), 4):
-            blocks.append(text[i : i + 4].ljust(4, "_"))
+    def generate_route(self, width=4):
+        return _rng.permutation(width).tolist()
 
-        # Convert blocks to a matrix of characters
-        char_blocks = [[ch for ch in item] for item in blocks]
-        matrix = np.array(char_blocks)
+    def encrypt(self, text, width=4, route="columns"):
+        if route not in self.ROUTES:
+            raise ValueError(f"Невідомий маршрут: {route}")
 
-        # Get dimensions
-        row_length = len(matrix)
-        column_length = len(matrix[0])
+        codes = to_codepoints(text.replace(" ", "_"))
 
-        # Generate random permutation indices
-        row_indices = np.random.permutation(row_length)
-        col_indices = np.random.permutation(column_length)
+        # Доповнюємо текст символами "_" до цілої кількості блоків
+        length = -(-len(codes) // width) * width
+        padded = np.full(length, ord("_"), dtype=np.uint32)
+        padded[: len(codes)] = codes
 
-        # Shuffle the matrix
-        shuffled_matrix = matrix[row_indices][:, col_indices]
+        # Обхід таблиці кешований; випадковий порядок стовпців застосовується до нього
+        order = self.generate_route(width)
+        encrypted_text = from_codepoints(padded[_route_forward(route, length, order)])
 
-        # Flatten the shuffled matrix in column-major order
-        flattened_matrix = shuffled_matrix.flatten(order="F")
+        return encrypted_text, self._format_key(route, order)
+
+    def decrypt(self, encrypted_text, key):
+        route, order = self._parse_key(key)
+        codes = to_codepoints(encrypted_text)
+        if len(codes) % len(order):
+            raise ValueError("Довжина шифрограми не кратна ширині блоку")
 
-        # Join into a single string
-        encrypted_text = "".join(flattened_matrix)
+        # Обернена перестановка як одна операція розсіювання
+        decrypted = np.empty_like(codes)
+        decrypted[_route_forward(route, len(codes), order)] = codes
+        decrypted_text = from_codepoints(decrypted)
 
-        # Create encryption key from the permutation indices
-        encryption_key = (
-            ",".join(map(str, row_indices)) + "|" + ",".join(map(str, col_indices))
+        return decrypted_text.replace("_", " ").strip()
+
+    def _encrypt_group_key(self, text, width=4, route="columns"):
+        return -(-len(text) // width) * width
+
+    def _encrypt_group(self, messages, width=4, route="columns"):
+        if route not in self.ROUTES:
+            raise ValueError(f"Невідомий маршрут: {route}")
+
+        length = self._encrypt_group_key(messages[0], width)
+        padded = np.full((len(messages), length), ord("_"), dtype=np.uint32)
+        for row, message in enumerate(messages):
+            codes = to_codepoints(message.replace(" ", "_"))
+            padded[row, : len(codes)] = codes
+
+        # Для кожного повідомлення власний порядок стовпців
+        orders = _random_permutations(len(messages), width)
+        forward = _route_forward(route, length, orders)
+        encrypted = np.take_along_axis(padded, forward, axis=1)
+
+        return [
+            (encrypted_text, self._format_key(route, order.tolist()))
+            for encrypted_text, order in zip(_split_rows(encrypted), orders)
+        ]
+
+    def _decrypt_group_key(self, encrypted_text, key):
+        route, order = self._parse_key(key)
+        return len(encrypted_text), route, len(order)
+
+    def _decrypt_group(self, ciphertexts, keys):
+        parsed = [self._parse_key(key) for key in keys]
+        route = parsed[0][0]
+        orders = np.array([order for _, order in parsed])
+        width = orders.shape[1]
+
+        codes = _stack_rows(ciphertexts)
+        length = codes.shape[1]
+        if length % width:
+            raise ValueError("Довжина шифрограми не кратна ширині блоку")
+
+        forward = _route_forward(route, length, orders)
+        decrypted = np.empty_like(codes)
+        np.put_along_axis(decrypted, forward, codes, axis=1)
+
+        return [text.replace("_", " ").strip() for text in _split_rows(decrypted)]
+
+    @staticmethod
+    def _format_key(route, order):
+        # Для маршруту за стовпцями шириною до 10 зберігаємо старий формат ("2031")
+        if route == "columns" and len(order) <= 10:
+            return "".join(str(i) for i in order)
+        return route + ":" + ",".join(str(i) for i in order)
+
+    @staticmethod
+    def _parse_key(key):
+        if ":" in key:
+            route, order = key.split(":")
+            return route, [int(i) for i in order.split(",")]
+        return "columns", [int(i) for i in key]
+
+
+class MultilevelCipher(_BatchMixin):
+    def __init__(self):
+        pass
+
+    def encrypt(self, text, columns=4, levels=2, rows=None):
+        """
+        Шифрує текст множинною перестановкою.
+
+        :param columns: Кількість стовпців (довжина блоку)
+        :param levels: 2 - перестановка рядків і стовпців матриці,
+                       3 - додатково перестановка шарів тензора
+        :param rows: Кількість рядків у шарі для levels=3 (за замовчуванням columns)
+        """
+        block_shape = self._block_shape(columns, levels, rows)
+
+        # Розбиваємо коди символів на блоки, доповнюючи останній символами "_"
+        codes = to_codepoints(text)
+        block_length = int(np.prod(block_shape))
+        block_count = max(1, -(-len(codes) // block_length))
+        padded = np.full(block_count * block_length, ord("_"), dtype=np.uint32)
+        padded[: len(codes)] = codes
+        tensor = padded.reshape((block_count,) + block_shape)
+
+        # Випадкова перестановка для кожного виміру та одне комбіноване вибирання
+        permutations = [_rng.permutation(size) for size in tensor.shape]
+        shuffled = tensor[np.ix_(*permutations)]
+
+        # Читаємо перемішаний тензор по стовпцях (column-major)
+        encrypted_text = from_codepoints(shuffled.ravel(order="F"))
+
+        # Ключ: перестановки для кожного виміру, розділені "|"
+        encryption_key = "|".join(
+            ",".join(map(str, permutation)) for permutation in permutations
         )
 
         return encrypted_text, encryption_key
 
     def decrypt(self, encrypted_text, encryption_key):
-        # Parse the encryption key to get row and column indices
-        row_indices_str, col_indices_str = encryption_key.split("|")
-        row_indices = np.array([int(x) for x in row_indices_str.split(",")])
-        col_indices = np.array([int(x) for x in col_indices_str.split(",")])
-
-        # Get dimensions from the key
-        row_length = len(row_indices)
-        column_length = len(col_indices)
-
-        # Create inverse permutation arrays for unshuffling
-        row_inverse = np.zeros(row_length, dtype=int)
-        for i, val in enumerate(row_indices):
-            row_inverse[val] = i
-
-        col_inverse = np.zeros(column_length, dtype=int)
-        for i, val in enumerate(col_indices):
-            col_inverse[val] = i
-
-        # Reshape the encrypted text to match the original shuffled matrix
-        encrypted_chars = list(encrypted_text)
-        reshuffled_matrix = np.array(encrypted_chars).reshape(
-            row_length, column_length, order="F"
+        # Розбираємо ключ на перестановки для кожного виміру
+        permutations = [
+            np.array(part.split(","), dtype=np.intp)
+            for part in encryption_key.split("|")
+        ]
+        shape = tuple(len(permutation) for permutation in permutations)
+
+        # Обернені перестановки через розсіювання
+        inverses = []
+        for permutation in permutations:
+            inverse = np.empty_like(permutation)
+            inverse[permutation] = np.arange(len(permutation))
+            inverses.append(inverse)
+
+        codes = to_codepoints(encrypted_text)
+        if len(codes) != int(np.prod(shape)):
+            raise ValueError("Довжина шифрограми не відповідає ключу")
+
+        # Відновлюємо тензор та повертаємо порядок одним вибиранням
+        tensor = codes.reshape(shape, order="F")
+        unshuffled = tensor[np.ix_(*inverses)]
+
+        # Перетворюємо назад на текст і видаляємо доповнення
+        return from_codepoints(unshuffled.ravel()).rstrip("_")
+
+    def _encrypt_group_key(self, text, columns=4, levels=2, rows=None):
+        block_length = math.prod(self._block_shape(columns, levels, rows))
+        return max(1, -(-len(text) // block_length))
+
+    def _encrypt_group(self, messages, columns=4, levels=2, rows=None):
+        block_shape = self._block_shape(columns, levels, rows)
+        block_count = self._encrypt_group_key(messages[0], columns, levels, rows)
+        shape = (block_count,) + block_shape
+
+        padded = np.full((len(messages), math.prod(shape)), ord("_"), dtype=np.uint32)
+        for row, message in enumerate(messages):
+            codes = to_codepoints(message)
+            padded[row, : len(codes)] = codes
+        tensors = padded.reshape((len(messages),) + shape)
+
+        # Окремі перестановки кожного виміру для кожного повідомлення
+        permutations = [_random_permutations(len(messages), size) for size in shape]
+        shuffled = tensors[self._batch_index(permutations)]
+
+        # Читання по стовпцях для кожного повідомлення окремо
+        axes = (0,) + tuple(range(len(shape), 0, -1))
+        encrypted = shuffled.transpose(axes).reshape(len(messages), -1)
+
+        keys = [
+            "|".join(",".join(map(str, permutation)) for permutation in row)
+            for row in zip(*(permutation.tolist() for permutation in permutations))
+        ]
+        return list(zip(_split_rows(encrypted), keys))
+
+    def _decrypt_group_key(self, encrypted_text, encryption_key):
+        shape = tuple(part.count(",") + 1 for part in encryption_key.split("|"))
+        return len(encrypted_text), shape
+
+    def _decrypt_group(self, ciphertexts, keys):
+        parsed = [key.split("|") for key in keys]
+        permutations = [
+            np.array([parts[axis].split(",") for parts in parsed], dtype=np.intp)
+            for axis in range(len(parsed[0]))
+        ]
+        shape = tuple(permutation.shape[1] for permutation in permutations)
+
+        # Обернені перестановки для всіх повідомлень одним розсіюванням на вимір
+        inverses = []
+        for permutation in permutations:
+            inverse = np.empty_like(permutation)
+            positions = np.broadcast_to(np.arange(permutation.shape[1]), permutation.shape)
+            np.put_along_axis(inverse, permutation, positions, axis=1)
+            inverses.append(inverse)
+
+        codes = _stack_rows(ciphertexts)
+        if codes.shape[1] != int(np.prod(shape)):
+            raise ValueError("Довжина шифрограми не відповідає ключу")
+
+        # Зворотне до читання по стовпцях та одне вибирання для всіх повідомлень
+        axes = (0,) + tuple(range(len(shape), 0, -1))
+        tensors = codes.reshape((len(ciphertexts),) + shape[::-1]).transpose(axes)
+        unshuffled = tensors[self._batch_index(inverses)]
+
+        return [
+            text.rstrip("_")
+            for text in _split_rows(unshuffled.reshape(len(ciphertexts), -1))
+        ]
+
+    @staticmethod
+    def _block_shape(columns, levels, rows):
+        if levels == 2:
+            return (columns,)
+        if levels == 3:
+            return (rows or columns, columns)
+        raise ValueError("Підтримуються лише 2 або 3 рівні перестановки")
+
+    @staticmethod
+    def _batch_index(permutations):
+        """Будує індекс для одночасної перестановки всіх вимірів усіх тензорів пакета."""
+        count, ndim = len(permutations[0]), len(permutations)
+        index = [np.arange(count).reshape((count,) + (1,) * ndim)]
+        for axis, permutation in enumerate(permutations):
+            shape = [count] + [1] * ndim
+            shape[axis + 1] = permutation.shape[1]
+            index.append(permutation.reshape(shape))
+        return tuple(index)
+
+
+# Текст для побудови біграмної моделі мови за замовчуванням
+DEFAULT_CORPUS = (
+    "Інформаційна безпека - це захист інформації та інфраструктури, яка її "
+    "підтримує, від випадкових або навмисних дій, що можуть завдати шкоди "
+    "власникам або користувачам інформації. Основними властивостями "
+    "інформації, які потрібно забезпечити, є конфіденційність, цілісність "
+    "та доступність. Конфіденційність означає, що доступ до даних мають лише "
+    "ті особи, яким він дозволений. Цілісність гарантує, що дані не були "
+    "змінені без дозволу, а доступність - що користувачі можуть отримати "
+    "інформацію тоді, коли вона їм потрібна. Для захисту повідомлень "
+    "здавна використовують шифри. Шифри перестановки не змінюють самих "
+    "символів повідомлення, а лише міняють їх порядок за певним правилом. "
+    "Шифри заміни, навпаки, замінюють кожен символ іншим символом або "
+    "групою символів. Сучасні системи поєднують обидва підходи та "
+    "спираються на складні математичні задачі, розв'язати які без ключа "
+    "практично неможливо. Криптоаналіз вивчає методи розкриття шифрів без "
+    "знання ключа. Для класичних шифрів часто достатньо статистики мови: "
+    "частоти окремих літер, пар літер та цілих слів дозволяють відновити "
+    "текст навіть тоді, коли ключ невідомий. Саме тому довжина ключа та "
+    "спосіб його генерації мають велике значення для стійкості шифру. "
+    "Студенти на лабораторних роботах вивчають прості шифри, щоб зрозуміти "
+    "основні принципи, на яких побудовані сучасні алгоритми захисту даних."
+)
+
+
+class BigramModel:
+    """Біграмна модель мови: логарифми ймовірностей пар сусідніх символів."""
+
+    def __init__(self, corpus=DEFAULT_CORPUS, smoothing=0.5):
+        corpus = corpus.lower()
+        symbols = sorted(set(corpus))
+        self.symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        # Останній індекс відведено під усі символи, яких немає в корпусі
+        self.unknown = len(symbols)
+
+        codes = self.encode(corpus)
+        size = self.unknown + 1
+        counts = np.zeros((size, size))
+        np.add.at(counts, (codes[:-1], codes[1:]), 1)
+
+        counts += smoothing
+        self.log_probabilities = np.log(counts / counts.sum(axis=1, keepdims=True))
+
+    def encode(self, text):
+        """Перетворює текст на масив індексів символів моделі."""
+        lookup = self.symbol_index
+        unknown = self.unknown
+        return np.array(
+            [lookup.get(char, unknown) for char in text.lower()], dtype=np.intp
         )
 
-        # Unshuffle the matrix using the inverse permutation indices
-        unshuffled_matrix = reshuffled_matrix[row_inverse][:, col_inverse]
-
-        # Convert back to text and remove padding
-        decrypted_text = "".join(["".join(row) for row in unshuffled_matrix]).rstrip(
-            "_"
-        )
 
-        return decrypted_text
+class MultilevelSolver:
+    """
+    Відновлення перестановки стовпців MultilevelCipher без знання ключа.
+
+    Один раз будує матрицю оцінок для пар сусідніх стовпців за біграмною
+    моделлю (біграми в усіх рядках) і шукає порядок стовпців променевим
+    пошуком (евристика задачі комівояжера) замість перебору n!.
+
+    Порядок рядків надійно не відновлюється: межу двох рядків описує лише одна
+    біграма, тому suggest_rows (і частина рядків у solve_key) - тільки
+    ймовірний варіант.
+    """
+
+    def __init__(self, model=None, beam_width=16):
+        self.model = model or BigramModel()
+        self.beam_width = beam_width
+
+    def solve(self, encrypted_text, columns=4):
+        """
+        Відновлює перестановку стовпців у форматі ключа MultilevelCipher.
+
+        :param encrypted_text: Шифрограма
+        :param columns: Кількість стовпців, використана при шифруванні
+        :return: Частина ключа після "|" (наприклад, "2,0,3,1")
+        """
+        matrix = self._matrix(encrypted_text, columns)
+        scores = self.model.log_probabilities
+
+        # Оцінка стовпця b одразу після стовпця a: сума біграм по всіх рядках
+        column_scores = scores[matrix[:, :, None], matrix[:, None, :]].sum(axis=0)
+        column_order = self._best_path(column_scores)
+
+        # Знайдений порядок - це обернена перестановка, ключ містить пряму
+        return ",".join(map(str, np.argsort(column_order)))
+
+    def restore_rows(self, encrypted_text, column_key):
+        """
+        Повертає рядки таблиці з відновленим порядком стовпців.
+
+        Рядки залишаються у порядку шифрограми (перемішаними).
+        """
+        column_order = np.argsort(np.array(column_key.split(","), dtype=np.intp))
+        rows = len(encrypted_text) // len(column_order)
+        raw = to_codepoints(encrypted_text).reshape((rows, len(column_order)), order="F")
+        return _split_rows(raw[:, column_order])
+
+    def suggest_rows(self, encrypted_text, column_key):
+        """
+        Пропонує ймовірну перестановку рядків (без гарантії правильності).
+
+        Оцінка рядка b одразу після рядка a - біграма (кінець a, початок b);
+        для коротких шифрограм цього замало, тож результат слід перевіряти.
+
+        :return: Частина ключа до "|" (кандидат)
+        """
+        rows = self.restore_rows(encrypted_text, column_key)
+        first = self.model.encode("".join(row[0] for row in rows))
+        last = self.model.encode("".join(row[-1] for row in rows))
+        row_scores = self.model.log_probabilities[last[:, None], first[None, :]]
+
+        # Рядок, що закінчується доповненням "_", може бути лише останнім
+        padded_rows = [i for i, row in enumerate(rows) if row.endswith("_")]
+        if len(padded_rows) == 1:
+            row_scores[padded_rows[0], :] = -np.inf
+
+        row_order = self._best_path(row_scores)
+        return ",".join(map(str, np.argsort(row_order)))
+
+    def solve_key(self, encrypted_text, columns=4):
+        """
+        Відновлює повний ключ MultilevelCipher у форматі "рядки|стовпці".
+
+        Стовпці відновлюються надійно (solve), а перестановка рядків - лише
+        евристичний кандидат suggest_rows, тож результат розшифрування слід
+        перевіряти.
+
+        :return: Ключ, придатний для MultilevelCipher.decrypt
+        """
+        column_key = self.solve(encrypted_text, columns)
+        return self.suggest_rows(encrypted_text, column_key) + "|" + column_key
+
+    def crack(self, encrypted_text, columns=4):
+        """
+        Розшифровує шифрограму ключем, відновленим solve_key.
+
+        :return: Кортеж (текст, ключ "рядки|стовпці" з кандидатом для рядків)
+        """
+        key = self.solve_key(encrypted_text, columns)
+        return MultilevelCipher().decrypt(encrypted_text, key), key
+
+    def _matrix(self, encrypted_text, columns):
+        """Відновлює перемішану матрицю індексів моделі (читання було по стовпцях)."""
+        if not encrypted_text or len(encrypted_text) % columns:
+            raise ValueError("Довжина шифрограми не кратна кількості стовпців")
+        rows = len(encrypted_text) // columns
+        return self.model.encode(encrypted_text).reshape((rows, columns), order="F")
+
+    def _best_path(self, scores):
+        """Шукає гамільтонів шлях з максимальною сумою оцінок переходів."""
+        size = len(scores)
+        scores = scores.copy()
+        np.fill_diagonal(scores, -np.inf)
+
+        # Початкові промені: по одному на кожну вершину
+        paths = np.arange(size)[:, None]
+        totals = np.zeros(size)
+        visited = np.eye(size, dtype=bool)
+
+        for _ in range(size - 1):
+            candidates = totals[:, None] + scores[paths[:, -1]]
+            candidates[visited] = -np.inf
+
+            # Залишаємо beam_width найкращих продовжень
+            flat = candidates.ravel()
+            keep = min(self.beam_width, np.isfinite(flat).sum())
+            best = np.argpartition(flat, -keep)[-keep:]
+            beams, nodes = np.divmod(best, size)
+
+            paths = np.column_stack((paths[beams], nodes))
+            totals = flat[best]
+            visited = visited[beams]
+            visited[np.arange(len(nodes)), nodes] = True
+
+        return paths[np.argmax(totals)]
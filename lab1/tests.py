@@ -1,3 +1,237 @@
+import io
+import time
+from unittest import mock
+
+import numpy as np
+
 from django.test import TestCase
 
+from .cipher import (
+    MultilevelCipher,
+    MultilevelSolver,
+    RoutePermutationCipher,
+    SinglePermutationCipher,
+)
+
 # Create your tests here.
+
+MESSAGE = "Шифри перестановки змінюють лише порядок символів"
+
+
+class SinglePermutationCipherTests(TestCase):
+    def setUp(self):
+        self.cipher = SinglePermutationCipher()
+
+    def test_round_trip(self):
+        for message in ("", "а", MESSAGE, MESSAGE * 20):
+            with self.subTest(length=len(message)):
+                encrypted, key = self.cipher.encrypt(message)
+                self.assertEqual(sorted(encrypted), sorted(message))
+                self.assertEqual(self.cipher.decrypt(encrypted, key), message)
+
+    def test_legacy_key(self):
+        # Старий формат: символ i тексту стоїть на позиції key[i] шифрограми
+        key = [3, 1, 4, 2]
+        encrypted = [""] * 4
+        for original, new in enumerate(key):
+            encrypted[new - 1] = "abcd"[original]
+        self.assertEqual(self.cipher.decrypt("".join(encrypted), "3-1-4-2"), "abcd")
+        self.assertEqual(self.cipher.decrypt("a", "1"), "a")
+
+    def test_pack_key_round_trip(self):
+        for length in (1, 255, 256, 257, 70_000):
+            with self.subTest(length=length):
+                _, key = self.cipher.encrypt("я" * length)
+                self.assertNotIn("-", key)
+                unpacked = SinglePermutationCipher.unpack_key(key, length)
+                self.assertEqual(sorted(unpacked.tolist()), list(range(length)))
+        with self.assertRaises(ValueError):
+            SinglePermutationCipher.unpack_key(key, length + 1)
+
+    def test_large_message(self):
+        message = MESSAGE * 40_000
+        started = time.perf_counter()
+        encrypted, key = self.cipher.encrypt(message)
+        self.assertEqual(self.cipher.decrypt(encrypted, key), message)
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_seeded_key_round_trip(self):
+        message = MESSAGE * 10
+        encrypted, key = self.cipher.encrypt(message, block_size=64)
+        self.assertRegex(key, r"^[0-9a-f]{16}:64$")
+        self.assertEqual(self.cipher.decrypt(encrypted, key), message)
+
+    def test_stream_matches_single_call(self):
+        message = MESSAGE * 10
+        encrypted, key = self.cipher.encrypt(message, block_size=64)
+        streamed = "".join(self.cipher.encrypt_stream(io.StringIO(message), key))
+        self.assertEqual(streamed, encrypted)
+
+        pieces = [encrypted[:5], encrypted[5:200], encrypted[200:]]
+        self.assertEqual("".join(self.cipher.decrypt_stream(pieces, key)), message)
+
+    def test_invalid_block_size(self):
+        with self.assertRaises(ValueError):
+            self.cipher.encrypt(MESSAGE, block_size=0)
+
+
+def reference_columns_encrypt(text, order):
+    """Початкова реалізація маршруту за стовпцями (блоки по len(order) символів)."""
+    width = len(order)
+    text = text.replace(" ", "_")
+    blocks = [text[i : i + width].ljust(width, "_") for i in range(0, len(text), width)]
+    return "".join("".join(block[pos] for block in blocks) for pos in order)
+
+
+class RoutePermutationCipherTests(TestCase):
+    def setUp(self):
+        self.cipher = RoutePermutationCipher()
+
+    def test_columns_route_matches_reference(self):
+        for order in ([2, 0, 3, 1], [4, 1, 0, 2, 3]):
+            with self.subTest(order=order):
+                with mock.patch.object(self.cipher, "generate_route", return_value=order):
+                    encrypted, key = self.cipher.encrypt(MESSAGE, width=len(order))
+                self.assertEqual(key, "".join(map(str, order)))
+                self.assertEqual(encrypted, reference_columns_encrypt(MESSAGE, order))
+
+    def test_legacy_key(self):
+        encrypted = reference_columns_encrypt(MESSAGE, [1, 3, 0, 2])
+        self.assertEqual(self.cipher.decrypt(encrypted, "1302"), MESSAGE)
+
+    def test_round_trip_for_all_routes(self):
+        for route in RoutePermutationCipher.ROUTES:
+            for width in (1, 3, 4, 7, 12):
+                with self.subTest(route=route, width=width):
+                    encrypted, key = self.cipher.encrypt(MESSAGE, width=width, route=route)
+                    self.assertEqual(len(encrypted) % width, 0)
+                    self.assertEqual(self.cipher.decrypt(encrypted, key), MESSAGE)
+
+    def test_routes_visit_every_cell_once(self):
+        for route in RoutePermutationCipher.ROUTES:
+            encrypted, _ = self.cipher.encrypt("abcdefghijklmnopqrstu", width=5, route=route)
+            self.assertEqual(sorted(encrypted), sorted("abcdefghijklmnopqrstu____"))
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            self.cipher.encrypt(MESSAGE, route="zigzag")
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt("abcde", "2031")
+
+
+def reference_multilevel_decrypt(encrypted_text, key):
+    """Початкова реалізація розшифрування двох рівнів (рядки та стовпці)."""
+    row_key, column_key = key.split("|")
+    rows = np.argsort([int(i) for i in row_key.split(",")])
+    columns = np.argsort([int(i) for i in column_key.split(",")])
+    matrix = np.array(list(encrypted_text)).reshape(len(rows), len(columns), order="F")
+    return "".join(matrix[rows][:, columns].ravel()).rstrip("_")
+
+
+class MultilevelCipherTests(TestCase):
+    def setUp(self):
+        self.cipher = MultilevelCipher()
+
+    def test_two_levels_match_reference(self):
+        for columns in (2, 4, 9):
+            with self.subTest(columns=columns):
+                encrypted, key = self.cipher.encrypt(MESSAGE, columns=columns)
+                row_key, column_key = key.split("|")
+                self.assertEqual(len(row_key.split(",")), -(-len(MESSAGE) // columns))
+                self.assertEqual(len(column_key.split(",")), columns)
+                self.assertEqual(reference_multilevel_decrypt(encrypted, key), MESSAGE)
+                self.assertEqual(self.cipher.decrypt(encrypted, key), MESSAGE)
+
+    def test_three_levels_round_trip(self):
+        for rows, columns in ((3, 5), (None, 4), (1, 1)):
+            with self.subTest(rows=rows, columns=columns):
+                encrypted, key = self.cipher.encrypt(MESSAGE, columns=columns, levels=3, rows=rows)
+                self.assertEqual(key.count("|"), 2)
+                self.assertEqual(self.cipher.decrypt(encrypted, key), MESSAGE)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            self.cipher.encrypt(MESSAGE, levels=4)
+        encrypted, key = self.cipher.encrypt(MESSAGE)
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt(encrypted[:-1], key)
+
+
+class BatchTests(TestCase):
+    messages = [MESSAGE, MESSAGE[::-1], "коротке", "", MESSAGE.upper(), "abc"]
+
+    def round_trip(self, cipher, **options):
+        results = cipher.encrypt_many(self.messages, **options)
+        self.assertEqual(len(results), len(self.messages))
+        encrypted = [encrypted for encrypted, _ in results]
+        keys = [key for _, key in results]
+        return cipher.decrypt_many(encrypted, keys), results
+
+    def test_single_permutation(self):
+        cipher = SinglePermutationCipher()
+        for options in ({}, {"block_size": 8}):
+            with self.subTest(options=options):
+                decrypted, results = self.round_trip(cipher, **options)
+                self.assertEqual(decrypted, self.messages)
+                # Кожен результат пакета розшифровується і поодинці
+                for message, (encrypted, key) in zip(self.messages, results):
+                    self.assertEqual(cipher.decrypt(encrypted, key), message)
+
+    def test_route_permutation(self):
+        cipher = RoutePermutationCipher()
+        for options in ({}, {"width": 5, "route": "spiral"}):
+            with self.subTest(options=options):
+                decrypted, _ = self.round_trip(cipher, **options)
+                self.assertEqual(decrypted, [message.strip() for message in self.messages])
+
+    def test_multilevel(self):
+        cipher = MultilevelCipher()
+        for options in ({}, {"columns": 3, "levels": 3}):
+            with self.subTest(options=options):
+                decrypted, _ = self.round_trip(cipher, **options)
+                self.assertEqual(decrypted, self.messages)
+
+    def test_ragged_messages_in_process_pool(self):
+        cipher = SinglePermutationCipher()
+        messages = ["a" * length for length in range(1, 6)]
+        with mock.patch.object(SinglePermutationCipher, "POOL_THRESHOLD", 2):
+            results = cipher.encrypt_many(messages)
+            decrypted = cipher.decrypt_many([e for e, _ in results], [k for _, k in results])
+        self.assertEqual(decrypted, messages)
+
+
+class MultilevelSolverTests(TestCase):
+    message = "Сьогодні ми вивчаємо шифри перестановки, які змінюють лише порядок символів."
+
+    def setUp(self):
+        self.solver = MultilevelSolver()
+
+    def test_recovers_column_permutation(self):
+        for columns in (4, 5, 6):
+            for _ in range(5):
+                encrypted, key = MultilevelCipher().encrypt(self.message, columns=columns)
+                row_key, column_key = key.split("|")
+                with self.subTest(columns=columns, key=key):
+                    self.assertEqual(self.solver.solve(encrypted, columns), column_key)
+                    rows = self.solver.restore_rows(encrypted, column_key)
+                    self.assertEqual(len(rows), len(row_key.split(",")))
+
+    def test_full_key_decrypts_known_sample(self):
+        # Фіксований генератор дає відомий ключ; на цьому зразку кандидат рядків точний
+        with mock.patch("lab1.cipher._rng", np.random.default_rng(0)):
+            encrypted, key = MultilevelCipher().encrypt(self.message, columns=8)
+
+        recovered = self.solver.solve_key(encrypted, columns=8)
+        self.assertEqual(recovered, key)
+        self.assertEqual(MultilevelCipher().decrypt(encrypted, recovered), self.message)
+        self.assertEqual(self.solver.crack(encrypted, columns=8), (self.message, key))
+
+    def test_full_key_is_always_valid(self):
+        encrypted, key = MultilevelCipher().encrypt(MESSAGE, columns=5)
+        text, recovered = self.solver.crack(encrypted, columns=5)
+        self.assertEqual(sorted(text), sorted(MESSAGE.ljust(len(encrypted), "_").rstrip("_")))
+        self.assertEqual(recovered.split("|")[1], key.split("|")[1])
+
+    def test_invalid_length(self):
+        with self.assertRaises(ValueError):
+            self.solver.solve("abcde", columns=4)
@@ -1,10 +1,83 @@
+import functools
 import random
+import re
+import threading
+from collections import deque
 import numpy as np
 import math
-import pandas as pd
 from typing import Tuple, Dict, List, Optional
 
+from labs.alphabet import UKRAINIAN, from_codepoints, to_codepoints
+from .utils import render_cipher_table
+
+
+class PolybianTables:
+    """
+    Скомпільований ключ Полібіанського квадрата.
+
+    Містить таблицю str.maketrans для шифрування, словник координати -> символ
+    для розшифрування та масиви для векторизованої обробки довгих текстів.
+    """
+
+    def __init__(self, key):
+        self.rows = len(key)
+        self.cols = len(key[0])
+        # Кількість цифр у кожній координаті (однакова для всіх координат)
+        self.width = len(str(max(self.rows, self.cols)))
+
+        # Символ -> координати (перше входження в таблиці, як при пошуку по рядках)
+        self.coordinates = {}
+        self.decode = {}
+        for i, row in enumerate(key):
+            for j, char in enumerate(row):
+                coordinate = self.format_coordinate(i, j)
+                self.coordinates.setdefault(char, coordinate)
+                self.decode[coordinate] = char
+
+        # Пробіл зберігається у шифрограмі; якщо він є в таблиці, перед ним
+        # також записуються його координати
+        self.encode = {ord(char): coordinate for char, coordinate in self.coordinates.items()}
+        self.encode[ord(" ")] = self.coordinates.get(" ", "") + " "
+        self.decode_pattern = re.compile(r"[0-9]{%d}" % (2 * self.width))
+
+        # Фрагменти шифрограми для кожного символу: рядок 0 - символ без змін
+        pieces = [""] + list(self.encode.values())
+        piece_width = max(len(piece) for piece in pieces)
+        self.pieces = np.zeros((len(pieces), piece_width), dtype=np.uint32)
+        self.piece_lengths = np.array([len(piece) for piece in pieces])
+        self.piece_lengths[0] = 1
+        for index, piece in enumerate(pieces[1:], 1):
+            self.pieces[index, : len(piece)] = to_codepoints(piece)
+
+        self.lookup = np.zeros(max(self.encode) + 1, dtype=np.intp)
+        self.lookup[list(self.encode)] = np.arange(1, len(pieces))
+
+        # Координати (рядок, стовпець), нумерація з 1 -> код символу (0 - некоректні)
+        self.cells = np.zeros((10**self.width, 10**self.width), dtype=np.uint32)
+        for i, row in enumerate(key):
+            self.cells[i + 1, 1 : len(row) + 1] = to_codepoints("".join(row))
+
+    def format_coordinate(self, row, col):
+        return f"{row + 1:0{self.width}d}{col + 1:0{self.width}d}"
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_polybian_key(key):
+    return PolybianTables(key)
+
+
 class PolybianSquare:
+    # Довжина тексту, починаючи з якої використовується векторизована обробка
+    VECTORIZE_THRESHOLD = 4096
+
+    # Розширений алфавіт: латиниця, кирилиця, цифри та розділові знаки
+    EXTENDED_ALPHABET = (
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        "АБВГҐДЕЄЁЖЗИІЇЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+        "0123456789"
+        "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~«»—–…№"
+    )
+
     def __init__(self, alphabet=None):
         """
         Ініціалізує Полібіанський квадрат.
@@ -54,27 +127,16 @@ class PolybianSquare:
         """
         # Генеруємо ключ
         key = self.generate_key()
+        tables = self.compile_key(key)
 
         # Перетворюємо текст на верхній регістр
         plaintext = plaintext.upper()
 
-        ciphertext = ""
-        for char in plaintext:
-            # Пропускаємо символи, яких немає в алфавіті
-            if char not in self.alphabet and char != " ":
-                ciphertext += char
-                continue
-
-            # Знаходимо координати символу в таблиці
-            for i, row in enumerate(key):
-                if char in row:
-                    j = row.index(char)
-                    # Додаємо координати як символи (i+1, j+1)
-                    ciphertext += f"{i+1}{j+1}"
-                    break
-            # Додаємо пробіл, якщо символ - пробіл
-            if char == " ":
-                ciphertext += " "
+        # Символи поза таблицею залишаються без змін
+        if len(plaintext) < self.VECTORIZE_THRESHOLD:
+            ciphertext = plaintext.translate(tables.encode)
+        else:
+            ciphertext = self._encrypt_vectorized(plaintext, tables)
 
         return ciphertext, key
 
@@ -83,37 +145,96 @@ class PolybianSquare:
         Розшифровує текст, зашифрований Полібіанським квадратом.
 
         :param ciphertext: Зашифрований текст.
-        :param key: Ключ шифрування (таблиця шифрозамін).
+        :param key: Ключ шифрування (таблиця шифрозамін або рядок з key_to_string).
         :return: Розшифрований текст.
         """
-        plaintext = ""
-        i = 0
-
-        while i < len(ciphertext):
-            if ciphertext[i] == " ":
-                plaintext += " "
-                i += 1
-                continue
+        if isinstance(key, str):
+            key = self.key_from_string(key)
+        tables = self.compile_key(key)
 
-            # Перевіряємо, чи є наступні два символи координатами
-            if i + 1 < len(ciphertext) and ciphertext[i].isdigit() and ciphertext[i+1].isdigit():
-                row = int(ciphertext[i]) - 1
-                col = int(ciphertext[i+1]) - 1
+        if len(ciphertext) >= self.VECTORIZE_THRESHOLD:
+            return self._decrypt_vectorized(ciphertext, tables)
 
-                # Перевіряємо, чи коректні координати
-                if 0 <= row < len(key) and 0 <= col < len(key[0]):
-                    plaintext += key[row][col]
-                else:
-                    # Якщо координати некоректні, додаємо їх як символи
-                    plaintext += ciphertext[i:i+2]
+        # Групи цифр по дві - координати; некоректні координати залишаються як є
+        return tables.decode_pattern.sub(
+            lambda match: tables.decode.get(match.group(), match.group()), ciphertext
+        )
 
-                i += 2
-            else:
-                # Якщо це не координати, додаємо символ без зміни
-                plaintext += ciphertext[i]
-                i += 1
+    @staticmethod
+    def key_to_string(key):
+        """
+        Серіалізує ключ як переставлений алфавіт (рядок таблиці за рядком).
 
-        return plaintext
+        Пробіли-заповнювачі в кінці таблиці відкидаються і відновлюються
+        key_from_string за розміром квадрата.
+        """
+        return "".join("".join(row) for row in key).rstrip(" ")
+
+    @staticmethod
+    def key_from_string(key):
+        """Відновлює таблицю ключа з рядка, створеного key_to_string."""
+        size = math.isqrt(len(key) - 1) + 1 if key else 1
+        key = key.ljust(size * size)
+        return [list(key[i : i + size]) for i in range(0, size * size, size)]
+
+    @staticmethod
+    def compile_key(key):
+        """Компілює ключ (таблицю) у таблиці відповідностей (з кешуванням)."""
+        return _compile_polybian_key(tuple(tuple(row) for row in key))
+
+    @staticmethod
+    def _encrypt_vectorized(plaintext, tables):
+        codes = to_codepoints(plaintext)
+
+        # Номер фрагмента для кожного символу (0 - символ поза таблицею)
+        ids = np.zeros(len(codes), dtype=np.intp)
+        known = codes < len(tables.lookup)
+        ids[known] = tables.lookup[codes[known]]
+
+        # Рядки фрагментів фіксованої ширини; маска відкидає порожні позиції
+        pieces = tables.pieces[ids]
+        pieces[:, 0] = np.where(ids == 0, codes, pieces[:, 0])
+        mask = tables.piece_lengths[ids][:, None] > np.arange(pieces.shape[1])
+
+        return from_codepoints(pieces[mask])
+
+    @staticmethod
+    def _decrypt_vectorized(ciphertext, tables):
+        codes = to_codepoints(ciphertext).copy()
+        token = 2 * tables.width
+
+        # Серії цифр розбиваються на координати зліва направо
+        is_digit = (codes >= ord("0")) & (codes <= ord("9"))
+        edges = np.diff(np.concatenate(([False], is_digit, [False])).astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if not len(starts):
+            return ciphertext
+        run = np.cumsum(edges[:-1] == 1) - 1
+
+        positions = np.arange(len(codes))
+        offset = positions - starts[run]
+        remaining = ends[run] - positions
+        token_starts = np.flatnonzero(is_digit & (offset % token == 0) & (remaining >= token))
+
+        # Обчислюємо номер рядка та стовпця кожної пари координат
+        digits = codes.astype(np.intp) - ord("0")
+        row = np.zeros(len(token_starts), dtype=np.intp)
+        col = np.zeros(len(token_starts), dtype=np.intp)
+        for k in range(tables.width):
+            row = row * 10 + digits[token_starts + k]
+            col = col * 10 + digits[token_starts + tables.width + k]
+        decoded = tables.cells[row, col]
+
+        # Коректні координати замінюємо символом, решту цифр залишаємо
+        valid = decoded != 0
+        token_starts, decoded = token_starts[valid], decoded[valid]
+        keep = np.ones(len(codes), dtype=bool)
+        for k in range(1, token):
+            keep[token_starts + k] = False
+        codes[token_starts] = decoded
+
+        return from_codepoints(codes[keep])
 
     def print_key(self, key):
         """
@@ -127,27 +248,23 @@ class PolybianSquare:
             print(f"{i+1}  " + " ".join(row))
 
 class HillCipher:
-    def __init__(self, block_size=3):
-        # Український алфавіт і відповідні числа, додаємо пробіл
-        self.alphabet = {
-            "А": 0, "Б": 1, "В": 2, "Г": 3, "Ґ": 4, "Д": 5,
-            "Е": 6, "Є": 7, "Ж": 8, "З": 9, "И": 10, "І": 11,
-            "Ї": 12, "Й": 13, "К": 14, "Л": 15, "М": 16,
-            "Н": 17, "О": 18, "П": 19, "Р": 20, "С": 21,
-            "Т": 22, "У": 23, "Ф": 24, "Х": 25, "Ц": 26,
-            "Ч": 27, "Ш": 28, "Щ": 29, "Ь": 30, "Ю": 31, "Я": 32,
-            " ": 33  # Додаємо пробіл як символ алфавіту
-        }
+    def __init__(self, block_size=3, use_key_pool=True):
+        # Український алфавіт з пробілом, скомпільований один раз (labs.alphabet)
+        self.codec = UKRAINIAN
+        self.alphabet = UKRAINIAN.scheme
 
         # Інвертований словник для перетворення чисел назад у символи
-        self.reverse_alphabet = {v: k for k, v in self.alphabet.items()}
+        self.reverse_alphabet = UKRAINIAN.reverse
 
         # Модуль - довжина алфавіту
-        self.modulus = len(self.alphabet)
+        self.modulus = UKRAINIAN.size
 
         # Розмір блоку
         self.block_size = block_size
 
+        # Чи брати ключові матриці з фонового пулу (HillKeyPool)
+        self.use_key_pool = use_key_pool
+
     # Розширений алгоритм Евкліда для знаходження мультиплікативного оберненого
     def modular_inverse(self, a, m):
         g, x, y = self.extended_gcd(a % m, m)
@@ -164,71 +281,109 @@ class HillCipher:
             gcd, x, y = self.extended_gcd(b % a, a)
             return gcd, y - (b // a) * x, x
 
-    # Обчислення детермінанта матриці
-    def determinant(self, matrix):
-        n = len(matrix)
-
-        if n == 1:
-            return matrix[0][0] % self.modulus
-
-        if n == 2:
-            return (matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]) % self.modulus
+    # Розклад модуля на степені простих чисел: {p: k}
+    @staticmethod
+    def factorize(n):
+        factors = {}
+        p = 2
+        while p * p <= n:
+            while n % p == 0:
+                factors[p] = factors.get(p, 0) + 1
+                n //= p
+            p += 1
+        if n > 1:
+            factors[n] = factors.get(n, 0) + 1
+        return factors
+
+    # Китайська теорема про остачі: об'єднує остачі за взаємно простими модулями
+    def crt(self, residues, moduli):
+        result, modulus = 0, 1
+        for residue, m in zip(residues, moduli):
+            # result + modulus * t = residue (mod m)
+            t = (residue - result) * self.modular_inverse(modulus, m) % m
+            result += modulus * t
+            modulus *= m
+        return result % modulus
+
+    # Показник степеня p у розкладі числа (для 0 - нескінченність)
+    @staticmethod
+    def _valuation(value, p):
+        if value == 0:
+            return math.inf
+        count = 0
+        while value % p == 0:
+            value //= p
+            count += 1
+        return count
+
+    # Детермінант за модулем p^k методом Гауса, O(n^3)
+    def _determinant_prime_power(self, matrix, p, k):
+        m = p ** k
+        a = [[x % m for x in row] for row in matrix]
+        n = len(a)
+        det = 1
 
-        det = 0
         for c in range(n):
-            # Обчислюємо алгебраїчне доповнення
-            submatrix = [row[:c] + row[c+1:] for row in matrix[1:]]
-            sign = (-1) ** c
-
-            # Рекурсивно обчислюємо детермінант підматриці
-            sub_det = self.determinant(submatrix)
-
-            # Додаємо до загального детермінанту
-            det = (det + sign * matrix[0][c] * sub_det) % self.modulus
-
-        return det
-
-    # Обчислення оберненої матриці за модулем
-    def inverse_matrix(self, matrix):
+            # Опорний елемент з найменшим степенем p ділить усі інші в стовпці
+            pivot = min(range(c, n), key=lambda r: self._valuation(a[r][c], p))
+            if a[pivot][c] == 0:
+                return 0
+            if pivot != c:
+                a[c], a[pivot] = a[pivot], a[c]
+                det = -det
+
+            power = p ** self._valuation(a[c][c], p)
+            inverse_unit = self.modular_inverse(a[c][c] // power, m)
+            det = det * a[c][c] % m
+
+            for r in range(c + 1, n):
+                if a[r][c]:
+                    factor = (a[r][c] // power) * inverse_unit % m
+                    a[r] = [(x - factor * y) % m for x, y in zip(a[r], a[c])]
+
+        return det % m
+
+    # Обернена матриця за модулем p^k методом Гауса-Жордана, O(n^3)
+    def _inverse_prime_power(self, matrix, p, k):
+        m = p ** k
         n = len(matrix)
+        a = [[x % m for x in row] + [int(i == j) for j in range(n)] for i, row in enumerate(matrix)]
 
-        # Обчислюємо детермінант
-        det = self.determinant(matrix)
-
-        # Перевіряємо, чи існує обернена матриця
-        try:
-            inverse_det = self.modular_inverse(det, self.modulus)
-        except:
-            raise Exception("Обернена матриця не існує")
+        for c in range(n):
+            # Опорний елемент має бути оборотним (не ділитися на p)
+            pivot = next((r for r in range(c, n) if a[r][c] % p), None)
+            if pivot is None:
+                raise Exception("Обернена матриця не існує")
+            a[c], a[pivot] = a[pivot], a[c]
 
-        # Для матриці 2x2
-        if n == 2:
-            result = [
-                [(matrix[1][1] * inverse_det) % self.modulus, (-matrix[0][1] * inverse_det) % self.modulus],
-                [(-matrix[1][0] * inverse_det) % self.modulus, (matrix[0][0] * inverse_det) % self.modulus]
-            ]
-            return result
+            inverse_pivot = self.modular_inverse(a[c][c], m)
+            a[c] = [x * inverse_pivot % m for x in a[c]]
 
-        # Для матриці 3x3 і більше
-        cofactors = []
-        for r in range(n):
-            cofactor_row = []
-            for c in range(n):
-                # Обчислюємо мінор
-                minor = [row[:c] + row[c+1:] for row in (matrix[:r] + matrix[r+1:])]
-                minor_det = self.determinant(minor)
+            for r in range(n):
+                if r != c and a[r][c]:
+                    factor = a[r][c]
+                    a[r] = [(x - factor * y) % m for x, y in zip(a[r], a[c])]
 
-                # Знак алгебраїчного доповнення
-                sign = (-1) ** (r + c)
+        return [row[n:] for row in a]
 
-                # Алгебраїчне доповнення
-                cofactor_row.append((sign * minor_det * inverse_det) % self.modulus)
-            cofactors.append(cofactor_row)
+    # Обчислення детермінанта матриці за модулем (через КТО за дільниками модуля)
+    def determinant(self, matrix):
+        factors = self.factorize(self.modulus)
+        residues = [self._determinant_prime_power(matrix, p, k) for p, k in factors.items()]
+        moduli = [p ** k for p, k in factors.items()]
+        return self.crt(residues, moduli)
 
-        # Транспонуємо матрицю алгебраїчних доповнень
-        result = [[cofactors[c][r] for c in range(n)] for r in range(n)]
+    # Обчислення оберненої матриці за модулем (через КТО за дільниками модуля)
+    def inverse_matrix(self, matrix):
+        n = len(matrix)
+        factors = self.factorize(self.modulus)
+        inverses = [self._inverse_prime_power(matrix, p, k) for p, k in factors.items()]
+        moduli = [p ** k for p, k in factors.items()]
 
-        return result
+        return [
+            [self.crt([inverse[r][c] for inverse in inverses], moduli) for c in range(n)]
+            for r in range(n)
+        ]
 
     # Генерація випадкової матриці шифрування та оберненої матриці
     def generate_key_matrix(self):
@@ -249,92 +404,135 @@ class HillCipher:
                 # Якщо обернена матриця не існує, генеруємо нову матрицю
                 continue
 
+    # Вибір block_size лінійно незалежних (за модулем простого p) блоків
+    def _independent_blocks(self, blocks, p):
+        basis = {}
+        selected = []
+        for index, block in enumerate(blocks):
+            vector = [int(x) % p for x in block]
+            # Зводимо вектор за вже відібраним базисом
+            for column, row in basis.items():
+                if vector[column]:
+                    factor = vector[column]
+                    vector = [(x - factor * y) % p for x, y in zip(vector, row)]
+            pivot = next((c for c, x in enumerate(vector) if x), None)
+            if pivot is None:
+                continue
+
+            inverse = self.modular_inverse(vector[pivot], p)
+            basis[pivot] = [x * inverse % p for x in vector]
+            selected.append(index)
+            if len(selected) == self.block_size:
+                return selected
+        return None
+
+    # Відновлення ключа за відомим відкритим текстом
+    def recover_key(self, plain_numbers, cipher_numbers):
+        """
+        Відновлює ключові матриці за вирівняними потоками чисел відкритого
+        тексту та шифрограми.
+
+        Для кожного степеня простого p^k з розкладу модуля вибираються блоки,
+        незалежні за модулем p, і ключ знаходиться методом Гауса; результати
+        об'єднуються за КТО. Кандидат перевіряється на всіх блоках одразу.
+
+        :return: Кортеж (матриця шифрування, матриця розшифрування).
+        """
+        n = self.block_size
+        length = min(len(plain_numbers), len(cipher_numbers)) // n * n
+        plain = np.asarray(plain_numbers[:length], dtype=np.int64).reshape(-1, n) % self.modulus
+        cipher = np.asarray(cipher_numbers[:length], dtype=np.int64).reshape(-1, n) % self.modulus
+
+        # Шифрування блоків: C = P * K^T, тому K^T = P_sel^(-1) * C_sel
+        solutions, moduli = [], []
+        for p, k in self.factorize(self.modulus).items():
+            m = p ** k
+            selected = self._independent_blocks(plain, p)
+            if selected is None:
+                raise ValueError("Недостатньо незалежних блоків відкритого тексту")
+
+            inverse = np.array(self._inverse_prime_power(plain[selected].tolist(), p, k))
+            solutions.append(inverse @ cipher[selected] % m)
+            moduli.append(m)
+
+        transposed = [
+            [self.crt([solution[r, c] for solution in solutions], moduli) for c in range(n)]
+            for r in range(n)
+        ]
+        encryption_matrix = [list(row) for row in zip(*transposed)]
+
+        # Перевіряємо кандидата на всіх блоках одним матричним добутком
+        if not np.array_equal(plain @ np.array(transposed) % self.modulus, cipher):
+            raise ValueError("Знайдений ключ не узгоджується з усіма блоками")
+
+        return encryption_matrix, self.inverse_matrix(encryption_matrix)
+
+    # Перетворення тексту в масив чисел (символи поза алфавітом пропускаються)
+    def text_to_array(self, text):
+        numbers = self.codec.to_indices(text)
+        return numbers[numbers >= 0]
+
     # Перетворення тексту в числа
     def text_to_numbers(self, text):
-        numbers = []
-        for char in text:
-            if char in self.alphabet:
-                numbers.append(self.alphabet[char])
-            else:
-                # Пропускаємо символи, яких немає в алфавіті
-                continue
-        return numbers
+        return self.text_to_array(text).tolist()
 
     # Перетворення чисел назад у текст
     def numbers_to_text(self, numbers):
-        text = ""
-        for number in numbers:
-            text += self.reverse_alphabet[number % self.modulus]
-        return text
+        numbers = np.asarray(numbers, dtype=np.int64) % self.modulus
+        return self.codec.from_indices(numbers)
 
     # Множення вектора на матрицю за модулем
     def multiply_block(self, block, matrix):
-        result = []
-        for i in range(len(matrix)):
-            sum_val = 0
-            for j in range(len(block)):
-                sum_val += block[j] * matrix[i][j]
-            result.append(sum_val % self.modulus)
-        return result
+        return (np.asarray(matrix) @ np.asarray(block) % self.modulus).tolist()
+
+    # Множення всіх блоків на матрицю за модулем одним матричним добутком
+    def multiply_blocks(self, numbers, matrix):
+        blocks = np.asarray(numbers, dtype=np.int64).reshape(-1, self.block_size)
+        return (blocks @ np.asarray(matrix, dtype=np.int64).T % self.modulus).ravel()
 
     # Шифрування тексту
     def encrypt(self, plaintext):
         # Перетворюємо текст в числа
-        numbers = self.text_to_numbers(plaintext)
+        numbers = self.text_to_array(plaintext)
 
         # Визначаємо кількість символів доповнення
-        padding_length = self.block_size - (len(numbers) % self.block_size)
-        if padding_length == self.block_size:
-            padding_length = 0  # Якщо довжина кратна розміру блоку, доповнення не потрібне
+        padding_length = -len(numbers) % self.block_size
 
-        # Додаємо символи доповнення, якщо потрібно
+        # Додаємо символи доповнення (кількість доповнень як значення)
         if padding_length > 0:
-            padding_value = padding_length  # Використовуємо кількість доповнень як значення
-            for _ in range(padding_length):
-                numbers.append(padding_value)
+            numbers = np.concatenate((numbers, np.full(padding_length, padding_length)))
 
-        # Генеруємо ключову матрицю та обернену матрицю
-        encryption_matrix, decryption_matrix = self.generate_key_matrix()
+        # Беремо ключову матрицю та обернену матрицю з пулу або генеруємо їх;
+        # пул створюється і починає заповнюватися під час першого шифрування
+        if self.use_key_pool:
+            pool = HillKeyPool.get(self.block_size, self.modulus)
+            encryption_matrix, decryption_matrix = pool.acquire()
+        else:
+            encryption_matrix, decryption_matrix = self.generate_key_matrix()
 
-        # Розбиваємо на блоки і шифруємо
-        encrypted_numbers = []
-        for i in range(0, len(numbers), self.block_size):
-            block = numbers[i:i + self.block_size]
-            encrypted_block = self.multiply_block(block, encryption_matrix)
-            encrypted_numbers.extend(encrypted_block)
+        # Шифруємо всі блоки одним матричним добутком
+        encrypted_numbers = self.multiply_blocks(numbers, encryption_matrix)
 
         # Перетворюємо зашифровані числа назад у текст
         encrypted_text = self.numbers_to_text(encrypted_numbers)
 
-        return (encrypted_text, encrypted_numbers), encryption_matrix, decryption_matrix
+        return (encrypted_text, encrypted_numbers.tolist()), encryption_matrix, decryption_matrix
 
     # Розшифрування тексту
     def decrypt(self, encrypted_data, decryption_matrix):
         encrypted_text, encrypted_numbers = encrypted_data
 
-        # Розбиваємо на блоки і розшифровуємо
-        decrypted_numbers = []
-        for i in range(0, len(encrypted_numbers), self.block_size):
-            block = encrypted_numbers[i:i + self.block_size]
-            decrypted_block = self.multiply_block(block, decryption_matrix)
-            decrypted_numbers.extend(decrypted_block)
+        # Розшифровуємо всі блоки одним матричним добутком
+        decrypted_numbers = self.multiply_blocks(encrypted_numbers, decryption_matrix)
 
         # Видаляємо доповнення, якщо воно є
         if len(decrypted_numbers) > 0:
             # Перевіряємо останній символ
-            last_value = decrypted_numbers[-1]
-
-            # Перевіряємо, чи це значення доповнення
-            if 0 < last_value < self.block_size:
-                # Перевіряємо всі символи доповнення
-                is_padding = True
-                for i in range(1, last_value + 1):
-                    if len(decrypted_numbers) - i < 0 or decrypted_numbers[-i] != last_value:
-                        is_padding = False
-                        break
-
-                # Якщо це доповнення, видаляємо його
-                if is_padding:
+            last_value = int(decrypted_numbers[-1])
+
+            # Перевіряємо, чи всі символи доповнення мають це значення
+            if 0 < last_value < self.block_size and last_value <= len(decrypted_numbers):
+                if np.all(decrypted_numbers[-last_value:] == last_value):
                     decrypted_numbers = decrypted_numbers[:-last_value]
 
         # Перетворюємо розшифровані числа назад у текст
@@ -342,7 +540,132 @@ class HillCipher:
 
         return decrypted_text
 
+class HillKeyPool:
+    """
+    Пул заздалегідь згенерованих пар (матриця шифрування, матриця розшифрування).
+
+    Фоновий потік заповнює пул до capacity і прокидається, коли кількість
+    ключів падає нижче low_water, тож видача ключа не залежить від кількості
+    відкинутих необоротних матриць. Пули спільні для кожної пари
+    (розмір блоку, модуль).
+    """
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, block_size=3, capacity=64, low_water=16):
+        self.cipher = HillCipher(block_size, use_key_pool=False)
+        self.capacity = capacity
+        self.low_water = low_water
+
+        self.hits = 0
+        self.misses = 0
+
+        self._keys = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    @classmethod
+    def get(cls, block_size, modulus):
+        """Повертає (створюючи та запускаючи за потреби) пул для (block_size, modulus)."""
+        with cls._pools_lock:
+            pool = cls._pools.get((block_size, modulus))
+            if pool is None:
+                pool = cls(block_size)
+                if pool.cipher.modulus != modulus:
+                    raise ValueError(f"Пул ключів для модуля {modulus} не підтримується")
+                cls._pools[(block_size, modulus)] = pool
+        pool.start()
+        return pool
+
+    def start(self):
+        """Запускає фоновий потік заповнення пулу."""
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._fill, name=f"hill-key-pool-{self.cipher.block_size}", daemon=True
+                )
+                self._thread.start()
+
+    def acquire(self):
+        """Видає пару ключових матриць за O(1); якщо пул порожній, генерує її одразу."""
+        with self._condition:
+            if self._keys:
+                self.hits += 1
+                pair = self._keys.popleft()
+                if len(self._keys) < self.low_water:
+                    self._condition.notify()
+                return pair
+            self.misses += 1
+            self._condition.notify()
+
+        return self.cipher.generate_key_matrix()
+
+    def stats(self):
+        """Статистика пулу: влучання, промахи та кількість готових ключів."""
+        with self._condition:
+            return {"hits": self.hits, "misses": self.misses, "available": len(self._keys)}
+
+    def _fill(self):
+        while True:
+            # Чекаємо, поки кількість ключів не впаде нижче нижньої межі
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._keys) < self.low_water)
+                missing = self.capacity - len(self._keys)
+
+            # Генеруємо ключі поза блокуванням, щоб не затримувати acquire
+            for _ in range(missing):
+                pair = self.cipher.generate_key_matrix()
+                with self._condition:
+                    self._keys.append(pair)
+
+# Коди всіх пробільних символів Unicode (str.isspace)
+_WHITESPACE_CODES = np.array([code for code in range(0x3001) if chr(code).isspace()], dtype=np.uint32)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_variant_decoder(table, row_markers, col_markers):
+    """
+    Будує словник біграма -> символ для ключа варіантного шифру.
+
+    Для кожної біграми зберігається перший кандидат у тому ж порядку, що й
+    при почерговому переборі: спершу (рядок, стовпець), потім (стовпець, рядок).
+    """
+    row_marker_letters = {}
+    for idx, marker in enumerate(row_markers):
+        for letter in marker:
+            row_marker_letters.setdefault(letter, []).append(idx)
+
+    col_marker_letters = {}
+    for idx, marker in enumerate(col_markers):
+        for letter in marker:
+            col_marker_letters.setdefault(letter, []).append(idx)
+
+    def first_candidate(rows, cols):
+        for row in rows:
+            for col in cols:
+                if 0 <= row < len(table) and 0 <= col < len(table[0]):
+                    return table[row][col]
+        return None
+
+    decode = {}
+    for first, second, rows_of, cols_of in (
+        (row_marker_letters, col_marker_letters, 0, 1),
+        (col_marker_letters, row_marker_letters, 1, 0),
+    ):
+        for a, a_indices in first.items():
+            for b, b_indices in second.items():
+                indices = (a_indices, b_indices)
+                char = first_candidate(indices[rows_of], indices[cols_of])
+                if char is not None:
+                    decode.setdefault(a + b, char)
+    return decode
+
+
 class VariantCipher:
+    # Частина шифрограми, що позначає пробільний символ відкритого тексту
+    SPACE_TOKEN = "/"
+
     def __init__(self,
                  row_markers: Optional[List[str]] = None,
                  col_markers: Optional[List[str]] = None,
@@ -427,12 +750,62 @@ class VariantCipher:
 
             self.table.append(row_data)
 
+        self._compile_homophones()
+
+    def _compile_homophones(self):
+        """
+        Компілює таблицю у масиви омофонів для векторизованого шифрування.
+
+        Для кожного символу зберігаються всі двобуквені комбінації літер маркерів
+        усіх його позицій; індекс 0 відведено під символи поза таблицею.
+        """
+        options = {}
+        for char, positions in self.char_to_positions.items():
+            options[char] = [
+                combination
+                for row, col in positions
+                for r_letter in self.row_markers[row]
+                for c_letter in self.col_markers[col]
+                for combination in (r_letter + c_letter, c_letter + r_letter)
+            ]
+
+        chars = list(options)
+        width = max((len(bigrams) for bigrams in options.values()), default=1)
+
+        self._bigrams = np.array([""] + [b for char in chars for b in options[char]], dtype=object)
+        self._homophones = np.zeros((len(chars) + 1, width), dtype=np.intp)
+        self._homophone_counts = np.ones(len(chars) + 1, dtype=np.intp)
+
+        offset = 1
+        for index, char in enumerate(chars, 1):
+            count = len(options[char])
+            self._homophones[index, :count] = np.arange(offset, offset + count)
+            self._homophone_counts[index] = count
+            offset += count
+
+        codes = to_codepoints("".join(chars))
+        self._char_lookup = np.zeros(int(codes.max(initial=0)) + 1, dtype=np.intp)
+        self._char_lookup[codes] = np.arange(1, len(chars) + 1)
+
+    def _encrypt_chars(self, chars: str) -> List[str]:
+        """Шифрує рядок символів (без пробілів), повертаючи список частин шифрограми."""
+        codes = to_codepoints(chars)
+        ids = np.zeros(len(codes), dtype=np.intp)
+        known = codes < len(self._char_lookup)
+        ids[known] = self._char_lookup[codes[known]]
+
+        # Випадковий омофон для кожного символу одним векторизованим вибором
+        choices = (np.random.random(len(ids)) * self._homophone_counts[ids]).astype(np.intp)
+        parts = self._bigrams[self._homophones[ids, choices]]
+
+        # Символи поза таблицею записуються у спеціальному форматі <символ>
+        for i in np.flatnonzero(ids == 0):
+            parts[i] = f"<{chars[i]}>"
+
+        return parts.tolist()
+
     def get_table_display(self) -> str:
         """Отримує HTML-представлення таблиці шифрозамін."""
-        df = pd.DataFrame(self.table)
-        df.columns = self.col_markers
-        df.index = self.row_markers
-
         # Додаємо необхідні стилі CSS
         css_style = """
         <style>
@@ -458,12 +831,8 @@ class VariantCipher:
         """
 
         # Генеруємо HTML таблиці
-        html = df.to_html(
-            classes="cipher-table",
-            border=1,
-            index=True,
-            escape=False,
-            justify='center'
+        html = render_cipher_table(
+            tuple(map(tuple, self.table)), tuple(self.row_markers), tuple(self.col_markers)
         )
 
         return css_style + html
@@ -481,127 +850,84 @@ class VariantCipher:
                 - Ключ шифрування (таблиця шифрозамін, маркери та структура оригінального тексту)
         """
         plaintext_upper = plaintext.upper()
-        encrypted_parts = []
-        original_structure = []
-        char_count = 0
-
-        # Зберігаємо структуру вихідного тексту
-        for i, char in enumerate(plaintext):
-            if char.isspace():
-                original_structure.append((i, 'space'))
-            else:
-                original_structure.append((i, 'char'))
-                char_count += 1
-
-        # Шифруємо кожний символ окремо (крім пробілів)
-        for char in plaintext_upper:
-            if char.isspace():
-                continue  # Пропускаємо пробіли при шифруванні
-
-            if char in self.char_to_positions:
-                # Отримуємо всі можливі позиції для цього символу
-                positions = self.char_to_positions[char]
-                # Вибираємо випадкову позицію
-                row, col = random.choice(positions)
-                row_marker = self.row_markers[row]
-                col_marker = self.col_markers[col]
-
-                # Генеруємо всі можливі комбінації окремих літер з маркерів рядків та стовпців
-                combinations = []
-                for r_letter in row_marker:
-                    for c_letter in col_marker:
-                        combinations.append(r_letter + c_letter)
-                        combinations.append(c_letter + r_letter)
-
-                # Вибираємо випадкову комбінацію
-                encrypted_parts.append(random.choice(combinations))
-            else:
-                # Якщо символ відсутній у таблиці шифрозамін, використовуємо спеціальний маркер
-                encrypted_parts.append(f"<{char}>")  # Спеціальний формат для нешифрованих символів
+        codes = to_codepoints(plaintext_upper)
+        spaces = np.isin(codes, _WHITESPACE_CODES)
+
+        # Шифруємо всі символи (крім пробілів) за один прохід
+        chars = from_codepoints(codes[~spaces])
+        parts = np.full(len(codes), self.SPACE_TOKEN, dtype=object)
+        parts[~spaces] = self._encrypt_chars(chars)
 
-        # Об'єднуємо зашифровані частини пробілами
-        encrypted_text = " ".join(encrypted_parts)
+        # Об'єднуємо зашифровані частини пробілами; кожен пробільний символ
+        # позначається окремою частиною SPACE_TOKEN
+        encrypted_text = " ".join(parts.tolist())
 
-        # Ключ шифрування включає таблицю, маркери та оригінальну структуру тексту
+        # Ключ шифрування включає лише таблицю та маркери (не залежить від довжини тексту)
         key = {
             "table": self.table,
             "row_markers": self.row_markers,
             "col_markers": self.col_markers,
-            "original_structure": original_structure
         }
 
         return encrypted_text, key
 
+    @staticmethod
+    def pack_key(key: Dict) -> str:
+        """Пакує ключ у короткий рядок: "таблиця|маркери рядків|маркери стовпців"."""
+        return "|".join((
+            "".join("".join(row) for row in key["table"]),
+            ",".join(key["row_markers"]),
+            ",".join(key["col_markers"]),
+        ))
+
+    @staticmethod
+    def unpack_key(key: str) -> Dict:
+        """Відновлює ключ з рядка, створеного pack_key."""
+        table, row_markers, col_markers = key.split("|")
+        size = math.isqrt(len(table))
+        return {
+            "table": [list(table[i : i + size]) for i in range(0, len(table), size)],
+            "row_markers": row_markers.split(","),
+            "col_markers": col_markers.split(","),
+        }
+
     def decrypt(self, ciphertext: str, key: Dict) -> str:
         """
         Розшифровує текст використовуючи наданий ключ.
 
         Аргументи:
             ciphertext: Зашифрований текст
-            key: Ключ шифрування, що містить таблицю шифрозамін, маркери та структуру оригінального тексту
+            key: Ключ шифрування (словник або рядок з pack_key), що містить
+                таблицю шифрозамін і маркери
 
         Повертає:
             Розшифрований текст з відновленою оригінальною структурою
         """
+        if isinstance(key, str):
+            key = self.unpack_key(key)
+
         # Завантажуємо компоненти ключа
         table = key["table"]
         row_markers = key["row_markers"]
         col_markers = key["col_markers"]
-        original_structure = key["original_structure"]
-
-        # Створюємо відображення для розшифрування
-        row_marker_letters = {}
-        for idx, marker in enumerate(row_markers):
-            for letter in marker:
-                if letter not in row_marker_letters:
-                    row_marker_letters[letter] = []
-                row_marker_letters[letter].append(idx)
-
-        col_marker_letters = {}
-        for idx, marker in enumerate(col_markers):
-            for letter in marker:
-                if letter not in col_marker_letters:
-                    col_marker_letters[letter] = []
-                col_marker_letters[letter].append(idx)
-
-        # Розділяємо зашифрований текст на частини
-        parts = ciphertext.split()
-        decrypted_chars = []
-
-        for part in parts:
-            # Перевіряємо чи це спеціальний маркер для нешифрованих символів
-            if part.startswith("<") and part.endswith(">") and len(part) >= 3:
-                decrypted_chars.append(part[1:-1])  # Витягуємо символ між < >
-                continue
 
-            if len(part) != 2:
-                # Якщо не двобуквена частина, залишаємо як є
-                decrypted_chars.append(part)
-                continue
+        # Таблиця біграма -> символ (компілюється один раз для ключа)
+        decode = _compile_variant_decoder(
+            tuple(map(tuple, table)), tuple(row_markers), tuple(col_markers)
+        )
 
-            first_letter, second_letter = part[0], part[1]
-            candidates = []
-
-            # Спробуємо першу літеру як маркер рядка, другу як маркер стовпця
-            if first_letter in row_marker_letters and second_letter in col_marker_letters:
-                for row in row_marker_letters[first_letter]:
-                    for col in col_marker_letters[second_letter]:
-                        if 0 <= row < len(table) and 0 <= col < len(table[0]):
-                            candidates.append(table[row][col])
-
-            # Спробуємо першу як маркер стовпця, другу як маркер рядка
-            if first_letter in col_marker_letters and second_letter in row_marker_letters:
-                for col in col_marker_letters[first_letter]:
-                    for row in row_marker_letters[second_letter]:
-                        if 0 <= row < len(table) and 0 <= col < len(table[0]):
-                            candidates.append(table[row][col])
-
-            # Якщо є кандидати, вибираємо перший
-            if candidates:
-                decrypted_chars.append(candidates[0])
-            else:
-                # Якщо немає кандидатів, залишаємо як є
-                decrypted_chars.append(part)
+        # Розшифровуємо всі частини за один прохід
+        decrypted_chars = [
+            " " if part == self.SPACE_TOKEN
+            else part[1:-1] if part.startswith("<") and part.endswith(">") and len(part) >= 3
+            else decode.get(part, part)
+            for part in ciphertext.split()
+        ]
+
+        # Ключі старого формату містять структуру тексту з позиціями пробілів
+        original_structure = key.get("original_structure")
+        if original_structure is None:
+            return "".join(decrypted_chars)
 
         # Відновлюємо оригінальну структуру тексту
         result = [""] * len(original_structure)
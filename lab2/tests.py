@@ -1,3 +1,333 @@
+import random
+import time
+from unittest import mock
+
+from django.apps import apps
 from django.test import TestCase
 
+from .cipher import HillCipher, HillKeyPool, PolybianSquare, VariantCipher
+from .utils import create_html_table, render_cipher_table
+
 # Create your tests here.
+
+
+class PolybianSquareTests(TestCase):
+    def setUp(self):
+        self.cipher = PolybianSquare()
+
+    def both_ways(self, function, *args):
+        """Виконує function для короткого тексту та примусово векторизованим шляхом."""
+        short = function(*args)
+        threshold = PolybianSquare.VECTORIZE_THRESHOLD
+        PolybianSquare.VECTORIZE_THRESHOLD = 0
+        try:
+            vectorized = function(*args)
+        finally:
+            PolybianSquare.VECTORIZE_THRESHOLD = threshold
+        return short, vectorized
+
+    def test_round_trip(self):
+        message = "Привіт, світ!"
+        encrypted, key = self.cipher.encrypt(message)
+        short, vectorized = self.both_ways(self.cipher.decrypt, encrypted, key)
+        self.assertEqual(short, vectorized)
+        self.assertEqual(short.split(), message.upper().split())
+
+    def test_vectorized_encrypt_matches_translate(self):
+        key = self.cipher.generate_key()
+        tables = PolybianSquare.compile_key(key)
+        message = "ПРИВІТ, СВІТ! abc 12"
+        self.assertEqual(
+            PolybianSquare._encrypt_vectorized(message, tables), message.translate(tables.encode)
+        )
+
+    def test_invalid_coordinates_are_kept(self):
+        encrypted, key = self.cipher.encrypt("ПРИВІТ")
+        for ciphertext in ("99" + encrypted, "1" + encrypted + "7", "١" + encrypted):
+            with self.subTest(ciphertext=ciphertext):
+                short, vectorized = self.both_ways(self.cipher.decrypt, ciphertext, key)
+                self.assertEqual(short, vectorized)
+
+    def test_extended_alphabet_uses_multi_digit_coordinates(self):
+        cipher = PolybianSquare(PolybianSquare.EXTENDED_ALPHABET)
+        message = "Hello, Світ! 2024 — №5 «ok»"
+        encrypted, key = cipher.encrypt(message)
+        self.assertGreater(len(key), 9)
+        self.assertEqual(PolybianSquare.compile_key(key).width, 2)
+        self.assertRegex(encrypted.split()[0], r"^([0-9]{4})+$")
+
+        short, vectorized = self.both_ways(cipher.decrypt, encrypted, key)
+        self.assertEqual(short, vectorized)
+        self.assertEqual(short.split(), message.upper().split())
+
+    def test_extended_alphabet_above_vectorize_threshold(self):
+        cipher = PolybianSquare(PolybianSquare.EXTENDED_ALPHABET)
+        message = "Quick brown fox, швидка лисиця: 0123456789!? " * 200
+        self.assertGreater(len(message), PolybianSquare.VECTORIZE_THRESHOLD)
+
+        encrypted, key = cipher.encrypt(message)
+        tables = PolybianSquare.compile_key(key)
+        self.assertEqual(encrypted, message.upper().translate(tables.encode))
+        decrypted = cipher.decrypt(encrypted, PolybianSquare.key_to_string(key))
+        self.assertEqual(decrypted.split(), message.upper().split())
+
+    def test_key_string_round_trip(self):
+        for alphabet in (None, PolybianSquare.EXTENDED_ALPHABET):
+            with self.subTest(alphabet=alphabet):
+                key = PolybianSquare(alphabet).generate_key()
+                packed = PolybianSquare.key_to_string(key)
+                self.assertEqual(sorted(packed.replace(" ", "")),
+                                 sorted(PolybianSquare(alphabet).alphabet))
+                self.assertEqual(PolybianSquare.key_from_string(packed), key)
+
+    def test_view_accepts_string_and_legacy_keys(self):
+        response = self.client.post(
+            "/lab2/", {"form_type": "polybius_encrypt_form", "polybius_original_message": "ПРИВІТ"}
+        )
+        encrypted = response.context["polybius_encrypted_message"]
+        key = response.context["polybius_encryption_key"]
+        for key_text in (response.context["polybius_encryption_key_string"], str(key)):
+            with self.subTest(key=key_text):
+                response = self.client.post("/lab2/", {
+                    "form_type": "polybius_decrypt_form",
+                    "polybius_encrypted_message": encrypted,
+                    "polybius_encryption_key": key_text,
+                })
+                self.assertEqual(response.context["polybius_decrypted_message"], "ПРИВІТ")
+
+
+class HillCipherTests(TestCase):
+    def setUp(self):
+        self.rng = random.Random(2)
+        self.cipher = HillCipher(use_key_pool=False)
+
+    def random_matrix(self, size):
+        return [[self.rng.randrange(34) for _ in range(size)] for _ in range(size)]
+
+    @staticmethod
+    def reference_determinant(matrix):
+        """Розклад за першим рядком у цілих числах."""
+        if len(matrix) == 1:
+            return matrix[0][0]
+        total = 0
+        for j, value in enumerate(matrix[0]):
+            minor = [row[:j] + row[j + 1 :] for row in matrix[1:]]
+            total += (-1) ** j * value * HillCipherTests.reference_determinant(minor)
+        return total
+
+    def test_factorize_and_crt(self):
+        self.assertEqual(HillCipher.factorize(34), {2: 1, 17: 1})
+        self.assertEqual(HillCipher.factorize(360), {2: 3, 3: 2, 5: 1})
+        self.assertEqual(self.cipher.crt([1, 5], [2, 17]), 5)
+        self.assertEqual(self.cipher.crt([0, 16], [2, 17]), 16)
+
+    def test_determinant_matches_reference(self):
+        for size in (1, 2, 3, 4, 5):
+            for _ in range(20):
+                matrix = self.random_matrix(size)
+                with self.subTest(matrix=matrix):
+                    self.assertEqual(
+                        self.cipher.determinant(matrix) % 34,
+                        self.reference_determinant(matrix) % 34,
+                    )
+
+    def test_inverse_matrix(self):
+        for size in (2, 3, 6):
+            checked = 0
+            while checked < 10:
+                matrix = self.random_matrix(size)
+                if self.cipher.determinant(matrix) % 2 == 0 or self.cipher.determinant(matrix) % 17 == 0:
+                    continue
+                inverse = self.cipher.inverse_matrix(matrix)
+                product = [
+                    [sum(matrix[i][k] * inverse[k][j] for k in range(size)) % 34 for j in range(size)]
+                    for i in range(size)
+                ]
+                self.assertEqual(product, [[int(i == j) for j in range(size)] for i in range(size)])
+                checked += 1
+
+    def test_singular_matrix_has_no_inverse(self):
+        with self.assertRaises(Exception):
+            self.cipher.inverse_matrix([[2, 4], [1, 2]])
+
+    def test_multiply_blocks_matches_per_block(self):
+        matrix = self.random_matrix(3)
+        numbers = [self.rng.randrange(34) for _ in range(300)]
+        expected = []
+        for i in range(0, len(numbers), 3):
+            expected += self.cipher.multiply_block(numbers[i : i + 3], matrix)
+        self.assertEqual(self.cipher.multiply_blocks(numbers, matrix).tolist(), expected)
+
+    def test_text_codec(self):
+        numbers = self.cipher.text_to_numbers("ПРИВІТ, Світ!")
+        self.assertEqual(numbers[:3], [19, 20, 10])
+        self.assertEqual(self.cipher.numbers_to_text(numbers), "ПРИВІТ С")
+        self.assertEqual(self.cipher.numbers_to_text([34, -1]), "А ")
+
+    def test_round_trip(self):
+        for message in ("ПРИВІТ СВІТЕ", "А", "АБ", "ШИФР ГІЛЛА " * 100):
+            with self.subTest(length=len(message)):
+                encrypted, encryption_matrix, decryption_matrix = self.cipher.encrypt(message)
+                self.assertEqual(len(encrypted[1]) % 3, 0)
+                self.assertEqual(self.cipher.decrypt(encrypted, decryption_matrix), message)
+
+
+class HillKeyPoolTests(TestCase):
+    def wait_for(self, pool, available):
+        deadline = time.monotonic() + 10
+        while pool.stats()["available"] != available:
+            self.assertLess(time.monotonic(), deadline, "Пул не заповнився")
+            time.sleep(0.01)
+
+    def assert_key_pair(self, pair, size):
+        encryption_matrix, decryption_matrix = pair
+        product = [
+            [sum(encryption_matrix[i][k] * decryption_matrix[k][j] for k in range(size)) % 34
+             for j in range(size)]
+            for i in range(size)
+        ]
+        self.assertEqual(product, [[int(i == j) for j in range(size)] for i in range(size)])
+
+    def test_empty_pool_misses(self):
+        pool = HillKeyPool(block_size=2, capacity=4, low_water=2)
+        self.assert_key_pair(pool.acquire(), 2)
+        self.assertEqual(pool.stats(), {"hits": 0, "misses": 1, "available": 0})
+
+    def test_full_pool_hits_and_refills_below_low_water(self):
+        pool = HillKeyPool(block_size=2, capacity=4, low_water=2)
+        pool.start()
+        self.wait_for(pool, 4)
+
+        # Вище нижньої межі пул не поповнюється
+        self.assert_key_pair(pool.acquire(), 2)
+        self.assert_key_pair(pool.acquire(), 2)
+        time.sleep(0.05)
+        self.assertEqual(pool.stats(), {"hits": 2, "misses": 0, "available": 2})
+
+        # Нижче нижньої межі фоновий потік доповнює пул до capacity
+        self.assert_key_pair(pool.acquire(), 2)
+        self.wait_for(pool, 4)
+        self.assertEqual(pool.stats()["hits"], 3)
+        self.assertEqual(pool.stats()["misses"], 0)
+
+    def test_pool_starts_on_first_encrypt(self):
+        with mock.patch.dict(HillKeyPool._pools, clear=True):
+            apps.get_app_config("lab2").ready()
+            self.assertEqual(HillKeyPool._pools, {})
+
+            cipher = HillCipher()
+            encrypted, _, decryption_matrix = cipher.encrypt("ПРИВІТ")
+            self.assertEqual(list(HillKeyPool._pools), [(3, 34)])
+            self.assertIsNotNone(HillKeyPool._pools[(3, 34)]._thread)
+            self.assertEqual(cipher.decrypt(encrypted, decryption_matrix), "ПРИВІТ")
+
+    def test_unsupported_modulus(self):
+        with mock.patch.dict(HillKeyPool._pools, clear=True):
+            with self.assertRaises(ValueError):
+                HillKeyPool.get(3, 26)
+
+
+class HillKeyRecoveryTests(TestCase):
+    def setUp(self):
+        self.cipher = HillCipher(use_key_pool=False)
+
+    def test_recover_key_from_known_plaintext(self):
+        message = "ЦЕ ВІДОМИЙ ВІДКРИТИЙ ТЕКСТ ДЛЯ ВІДНОВЛЕННЯ КЛЮЧА ШИФРУ ХІЛЛА"
+        (encrypted_text, encrypted_numbers), encryption_matrix, _ = self.cipher.encrypt(message)
+        plain_numbers = self.cipher.text_to_numbers(message)
+        recovered, inverse = self.cipher.recover_key(plain_numbers, encrypted_numbers)
+        self.assertEqual([list(map(int, row)) for row in recovered],
+                         [list(map(int, row)) for row in encryption_matrix])
+        self.assertEqual(self.cipher.decrypt((encrypted_text, encrypted_numbers), inverse), message)
+
+    def test_recover_key_needs_independent_blocks(self):
+        numbers = self.cipher.text_to_numbers("ААА" * 5)
+        with self.assertRaises(ValueError):
+            self.cipher.recover_key(numbers, numbers)
+
+
+class VariantCipherTests(TestCase):
+    def setUp(self):
+        self.cipher = VariantCipher()
+
+    def test_parts_are_homophones_of_their_symbols(self):
+        message = "ШИФР ЗАМІНИ" * 20
+        encrypted, key = self.cipher.encrypt(message)
+        parts = encrypted.split()
+        self.assertEqual(len(parts), len(message))
+        for char, part in zip(message, parts):
+            if char == " ":
+                self.assertEqual(part, VariantCipher.SPACE_TOKEN)
+                continue
+            cells = [
+                (row, col)
+                for row, markers in enumerate(key["row_markers"])
+                for col, col_markers in enumerate(key["col_markers"])
+                if (part[0] in markers and part[1] in col_markers)
+                or (part[1] in markers and part[0] in col_markers)
+            ]
+            self.assertIn(char, [key["table"][row][col] for row, col in cells])
+
+    def test_round_trip(self):
+        for message in ("ПРИВІТ СВІТ", "Привіт,  світ!\tЩЕ РАЗ", "", "abc"):
+            with self.subTest(message=message):
+                encrypted, key = self.cipher.encrypt(message)
+                expected = "".join(" " if char.isspace() else char for char in message.upper())
+                self.assertEqual(self.cipher.decrypt(encrypted, key), expected)
+
+    def test_key_size_does_not_depend_on_message(self):
+        _, short_key = self.cipher.encrypt("КЛЮЧ")
+        _, long_key = self.cipher.encrypt("ДОВГИЙ ТЕКСТ " * 1000)
+        self.assertEqual(len(VariantCipher.pack_key(short_key)), len(VariantCipher.pack_key(long_key)))
+
+    def test_pack_key_round_trip(self):
+        message = "ПРИВІТ СВІТ"
+        encrypted, key = self.cipher.encrypt(message)
+        packed = VariantCipher.pack_key(key)
+        self.assertEqual(VariantCipher.unpack_key(packed), key)
+        self.assertEqual(self.cipher.decrypt(encrypted, packed), message)
+
+    def test_legacy_key_with_structure(self):
+        encrypted, key = self.cipher.encrypt("АБ В")
+        parts = [part for part in encrypted.split() if part != VariantCipher.SPACE_TOKEN]
+        legacy = dict(key, original_structure=[(0, "char"), (1, "char"), (2, "space"), (3, "char")])
+        self.assertEqual(self.cipher.decrypt(" ".join(parts), legacy), "АБ В")
+
+    def test_view_round_trip(self):
+        response = self.client.post(
+            "/lab2/", {"form_type": "variant_encrypt_form", "variant_message": "ПРИВІТ СВІТ"}
+        )
+        response = self.client.post("/lab2/", {
+            "form_type": "variant_decrypt_form",
+            "variant_encrypted_message": response.context["variant_encrypted_message"],
+            "variant_encryption_key": response.context["variant_encryption_key"],
+        })
+        self.assertEqual(response.context["variant_decrypted_message"], "ПРИВІТ СВІТ")
+
+
+class CipherTableTests(TestCase):
+    table = (("<", "Б"), ("&", "-"))
+
+    def test_render_matches_known_markup(self):
+        html = render_cipher_table(self.table, ("А1", "<Б>"), ("В", "Г"), (("Б", 2), ("<", 1)))
+        self.assertEqual(html, (
+            '<table class="cipher-table"><thead><tr><th></th><th>В</th><th>Г</th></tr></thead>'
+            '<tbody><tr><th>А1</th>'
+            '<td class="highlight-char">&lt;<span class="char-count">1</span></td>'
+            '<td class="highlight-char">Б<span class="char-count">2</span></td></tr>'
+            '<tr><th>&lt;Б&gt;</th><td>&amp;</td><td>-</td></tr></tbody></table>'
+        ))
+
+    def test_create_html_table_counts_message_letters(self):
+        html = create_html_table([list(row) for row in self.table], ["А", "Б"], ["В", "Г"],
+                                 original_message="бб <x")
+        self.assertIn('<td class="highlight-char">Б<span class="char-count">2</span></td>', html)
+        self.assertIn('<td class="highlight-char">&lt;<span class="char-count">1</span></td>', html)
+        self.assertIn("<td>&amp;</td>", html)
+        self.assertTrue(html.lstrip().startswith("<style>"))
+
+    def test_render_is_cached(self):
+        render_cipher_table.cache_clear()
+        for _ in range(3):
+            create_html_table(self.table, ["А", "Б"], ["В", "Г"], original_message="Б")
+        self.assertEqual(render_cipher_table.cache_info().hits, 2)
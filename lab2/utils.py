@@ -1,24 +1,10 @@
-def create_html_table(table, row_markers, col_markers, original_message=None):
-    """
-    Створює HTML-таблицю з підсвічуванням літер з оригінального повідомлення.
+import functools
+from collections import Counter
+from html import escape
 
-    Args:
-        table: Таблиця шифрозамін
-        row_markers: Маркери рядків
-        col_markers: Маркери стовпців
-        original_message: Оригінальне повідомлення для підсвічування літер
-    """
-    # Перетворюємо оригінальне повідомлення у верхній регістр і створюємо множину унікальних літер
-    if original_message:
-        # Створюємо словник для підрахунку кількості кожної літери
-        char_counts = {}
-        for char in original_message.upper():
-            if not char.isspace():  # Ігноруємо пробіли
-                char_counts[char] = char_counts.get(char, 0) + 1
-    else:
-        char_counts = {}
 
-    html = """
+# Стилі таблиці з підсвічуванням літер повідомлення
+_TABLE_STYLE = """
     <style>
         .cipher-table {
             border-collapse: collapse;
@@ -57,45 +43,71 @@ def create_html_table(table, row_markers, col_markers, original_message=None):
             line-height: 1;
         }
     </style>
-    <table class="cipher-table">
-        <thead>
-            <tr>
-                <th></th>
-    """
+"""
 
-    # Додаємо заголовки колонок
-    for col in col_markers:
-        html += f"<th>{col}</th>"
+_TABLE_LEGEND = """
+    <div class="legend mt-3">
+        <p><i>Примітка: жовтим кольором позначено літери з оригінального повідомлення.
+        Число в правому верхньому куті показує кількість входжень літери в повідомлення.</i></p>
+    </div>
+"""
 
-    html += """
-            </tr>
-        </thead>
-        <tbody>
+
+@functools.lru_cache(maxsize=256)
+def render_cipher_table(table, row_markers, col_markers, char_counts=()):
+    """
+    Будує HTML-розмітку таблиці шифрозамін (з кешуванням).
+
+    Args:
+        table: Таблиця шифрозамін (кортеж кортежів)
+        row_markers: Маркери рядків (кортеж)
+        col_markers: Маркери стовпців (кортеж)
+        char_counts: Кортеж пар (символ, кількість входжень) для підсвічування
     """
+    char_counts = dict(char_counts)
+
+    # Текст клітинок і маркерів екрануємо: розмітка вставляється в шаблон як є
+    parts = ['<table class="cipher-table"><thead><tr><th></th>']
+    parts.extend(f"<th>{escape(col)}</th>" for col in col_markers)
+    parts.append("</tr></thead><tbody>")
 
-    # Додаємо рядки з даними
     for i, row_marker in enumerate(row_markers):
-        html += f"<tr><th>{row_marker}</th>"
+        parts.append(f"<tr><th>{escape(row_marker)}</th>")
         for j in range(len(col_markers)):
             char = table[i][j]
             char_count = char_counts.get(char, 0)
-
             if char_count > 0:
-                html += f'<td class="highlight-char">{char}'
-                html += f'<span class="char-count">{char_count}</span>'
-                html += '</td>'
+                parts.append(
+                    f'<td class="highlight-char">{escape(char)}'
+                    f'<span class="char-count">{char_count}</span></td>'
+                )
             else:
-                html += f"<td>{char}</td>"
-        html += "</tr>"
+                parts.append(f"<td>{escape(char)}</td>")
+        parts.append("</tr>")
 
-    html += """
-        </tbody>
-    </table>
+    parts.append("</tbody></table>")
+    return "".join(parts)
 
-    <div class="legend mt-3">
-        <p><i>Примітка: жовтим кольором позначено літери з оригінального повідомлення.
-        Число в правому верхньому куті показує кількість входжень літери в повідомлення.</i></p>
-    </div>
+
+def create_html_table(table, row_markers, col_markers, original_message=None):
+    """
+    Створює HTML-таблицю з підсвічуванням літер з оригінального повідомлення.
+
+    Args:
+        table: Таблиця шифрозамін
+        row_markers: Маркери рядків
+        col_markers: Маркери стовпців
+        original_message: Оригінальне повідомлення для підсвічування літер
     """
+    table = tuple(map(tuple, table))
+
+    # Підраховуємо кількість кожної літери (без пробілів); для ключа кешу
+    # залишаємо лише літери, що є в таблиці
+    char_counts = ()
+    if original_message:
+        cells = {char for row in table for char in row}
+        counts = Counter(char for char in original_message.upper() if not char.isspace())
+        char_counts = tuple(sorted((char, n) for char, n in counts.items() if char in cells))
 
-    return html
+    html = render_cipher_table(table, tuple(row_markers), tuple(col_markers), char_counts)
+    return _TABLE_STYLE + html + _TABLE_LEGEND
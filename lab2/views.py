@@ -19,13 +19,16 @@ def lab2(request):
             context["polybius_original_message"] = message
             context["polybius_encrypted_message"] = encrypted_message
             context["polybius_encryption_key"] = encryption_key
+            context["polybius_encryption_key_string"] = PolybianSquare.key_to_string(encryption_key)
             context['range'] = range(1, len(encryption_key[0]) + 1)
 
             return render(request, "lab2.html", context)
         elif form_type == "polybius_decrypt_form":
             encrypted_message = request.POST.get("polybius_encrypted_message", "")
             encryption_key = request.POST.get("polybius_encryption_key", "")
-            encryption_key = ast.literal_eval(encryption_key)
+            # Ключі старого формату (список списків) підтримуємо для сумісності
+            if encryption_key.startswith("[["):
+                encryption_key = ast.literal_eval(encryption_key)
             decrypted_message = PolybianSquare().decrypt(encrypted_message, encryption_key)
 
             context["polybius_decrypted_message"] = decrypted_message
@@ -66,7 +69,7 @@ def lab2(request):
 
             context["variant_message"] = message
             context["variant_encrypted_message"] = encrypted_message
-            context["variant_encryption_key"] = key
+            context["variant_encryption_key"] = VariantCipher.pack_key(key)
 
             context["variant_encryption_matrix"] = encryption_matrix
 
@@ -75,7 +78,9 @@ def lab2(request):
         elif form_type == "variant_decrypt_form":
             encrypted_message = request.POST.get("variant_encrypted_message", "")
             encryption_key = request.POST.get("variant_encryption_key", "")
-            encryption_key = ast.literal_eval(encryption_key)
+            # Ключі старого формату (словник зі структурою тексту) підтримуємо для сумісності
+            if encryption_key.startswith("{"):
+                encryption_key = ast.literal_eval(encryption_key)
             decrypted_message = VariantCipher().decrypt(encrypted_message, encryption_key)
 
             context["variant_decrypted_message"] = decrypted_message
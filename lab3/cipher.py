@@ -1,282 +1,248 @@
 import random
+import numpy as np
+
+from labs.alphabet import UKRAINIAN, from_codepoints, to_codepoints
 
 
 class ModAdditionCipher:
     def __init__(self):
-        self.scheme = {
-            "А": 0,
-            "Б": 1,
-            "В": 2,
-            "Г": 3,
-            "Ґ": 4,
-            "Д": 5,
-            "Е": 6,
-            "Є": 7,
-            "Ж": 8,
-            "З": 9,
-            "И": 10,
-            "І": 11,
-            "Ї": 12,
-            "Й": 13,
-            "К": 14,
-            "Л": 15,
-            "М": 16,
-            "Н": 17,
-            "О": 18,
-            "П": 19,
-            "Р": 20,
-            "С": 21,
-            "Т": 22,
-            "У": 23,
-            "Ф": 24,
-            "Х": 25,
-            "Ц": 26,
-            "Ч": 27,
-            "Ш": 28,
-            "Щ": 29,
-            "Ь": 30,
-            "Ю": 31,
-            "Я": 32,
-            " ": 33,  # Додаємо пробіл як символ алфавіту
-        }
-        # Створюємо зворотню схему для розшифрування
-        self.reverse_scheme = {v: k for k, v in self.scheme.items()}
+        # Спільний скомпільований алфавіт (labs.alphabet)
+        self.codec = UKRAINIAN
+        self.scheme = UKRAINIAN.scheme
+        # Зворотня схема для розшифрування
+        self.reverse_scheme = UKRAINIAN.reverse
         # Довжина схеми (N для операції за модулем)
-        self.N = len(self.scheme)
+        self.N = UKRAINIAN.size
+
+        # Таблиці перетворення: код символу -> індекс (-1 поза схемою) та індекс -> код
+        self.symbols = UKRAINIAN.symbols
+        self.lookup = UKRAINIAN.lookup
+
+    def _to_indices(self, codes):
+        """Перетворює коди символів на індекси схеми (-1 для символів поза схемою)."""
+        return self.codec.codes_to_indices(codes)
+
+    def _key_indices(self, key):
+        """Перетворює ключ на індекси схеми (-1 для символів поза схемою)."""
+        if not key:
+            raise ValueError("Ключ не може бути порожнім")
+        return self._to_indices(to_codepoints(key))
+
+    def _shift(self, indices, key, key_indices, sign):
+        """
+        Обчислює (indices_i + sign * k_i) mod N, де k_i - індекс ключа для позиції i.
+
+        Ключ не повторюється до довжини повідомлення: індекси повідомлення
+        доповнюються до таблиці з рядками довжини ключа, і ключ додається до
+        всіх рядків трансляцією (broadcasting).
+        """
+        width = len(key_indices)
+        rows = -(-len(indices) // width)
+        grid = np.full((rows, width), -1, dtype=np.int64)
+        grid.ravel()[: len(indices)] = indices
+
+        # Ключ має складатися з символів схеми там, де він застосовується
+        if (key_indices < 0).any():
+            invalid = np.flatnonzero((grid >= 0) & (key_indices < 0))
+            if len(invalid):
+                raise KeyError(key[invalid[0] % width])
+
+        grid += sign * key_indices
+        grid %= self.N
+        return grid.ravel()[: len(indices)]
+
+    def _apply(self, codes, indices, key, key_indices, sign):
+        """
+        Записує в коди символів результат (indices + sign * k) mod N для символів схеми.
+
+        :return: Кортеж (коди результату, індекси результату, маска символів схеми)
+        """
+        inside = indices >= 0
+        if not len(indices):
+            return codes, indices, inside
+        shifted = self._shift(indices, key, key_indices, sign)
+        result = np.where(inside, self.symbols[shifted], codes)
+        return result, shifted, inside
 
     def encrypt(self, message, key):
         message = message.upper()  # Переводимо в верхній регістр
         key = key.upper()  # Переводимо в верхній регістр
 
-        # Розширюємо ключ, якщо він коротший за повідомлення
-        if len(key) < len(message):
-            key = (key * (len(message) // len(key) + 1))[: len(message)]
-
-        encrypted = []
-
-        for i in range(len(message)):
-            # Пропускаємо символи, яких немає в нашій схемі
-            if message[i] not in self.scheme:
-                encrypted.append(message[i])
-                continue
+        # c_i = (p_i + k_i) mod N; символи поза схемою залишаються без змін
+        codes = to_codepoints(message)
+        p = self._to_indices(codes)
+        k = self._key_indices(key) if len(p) else p
+        encrypted, _, _ = self._apply(codes, p, key, k, 1)
 
-            p_i = self.scheme[message[i]]
-            k_i = self.scheme[key[i]]
-            c_i = (p_i + k_i) % self.N
-            encrypted.append(self.reverse_scheme[c_i])
+        return from_codepoints(encrypted)
 
-        return "".join(encrypted)
+    def decrypt(self, encrypted, key, visualize=False):
+        """
+        Розшифровує повідомлення.
 
-    def decrypt(self, encrypted, key):
+        :param visualize: Якщо True, повертає також DecryptionVisualization
+        :return: Розшифрований текст або кортеж (текст, візуалізація)
+        """
         encrypted = encrypted.upper()  # Переводимо в верхній регістр
         key = key.upper()  # Переводимо в верхній регістр
 
-        # Розширюємо ключ, якщо він коротший за зашифроване повідомлення
-        if len(key) < len(encrypted):
-            key = (key * (len(encrypted) // len(key) + 1))[: len(encrypted)]
-
-        decrypted = []
-
-        # Створюємо дані для візуалізації
-        visualization = {
-            "message_chars": [],
-            "message_indices": [],
-            "key_chars": [],
-            "key_indices": [],
-            "encrypted_chars": [],
-            "encrypted_indices": [],
-        }
-
-        for i in range(len(encrypted)):
-            # Пропускаємо символи, яких немає в нашій схемі
-            if encrypted[i] not in self.scheme:
-                decrypted.append(encrypted[i])
-                continue
-
-            c_i = self.scheme[encrypted[i]]
-            k_i = self.scheme[key[i]]
-            p_i = (c_i + self.N - k_i) % self.N
-            decrypted_char = self.reverse_scheme[p_i]
-            decrypted.append(decrypted_char)
-
-            # Додаємо до візуалізації
-            visualization["message_chars"].append(decrypted_char)
-            visualization["message_indices"].append(p_i)
-            visualization["key_chars"].append(key[i])
-            visualization["key_indices"].append(k_i)
-            visualization["encrypted_chars"].append(encrypted[i])
-            visualization["encrypted_indices"].append(c_i)
-
-        decrypted_text = "".join(decrypted)
-
-        # Створюємо таблицю візуалізації
-        table = self._create_visualization_table(visualization)
-
-        return decrypted_text, table
-
-    def _create_visualization_table(self, visualization):
-        # Створюємо таблицю з трьох груп, кожна з яких має два рядки (символ та індекс)
-        table_rows = []
-
-        # Перша група: символи розшифрованого повідомлення та їх індекси
-        row = "|"
-        for char in visualization["message_chars"]:
-            row += f" {char} |"
-        table_rows.append(row)
-
-        row = "|"
-        for idx in visualization["message_indices"]:
-            row += f" {idx} |"
-        table_rows.append(row)
-
-        # Друга група: символи ключа та їх індекси
-        row = "|"
-        for char in visualization["key_chars"]:
-            row += f" {char} |"
-        table_rows.append(row)
-
-        row = "|"
-        for idx in visualization["key_indices"]:
-            row += f" {idx} |"
-        table_rows.append(row)
-
-        # Третя група: символи зашифрованого повідомлення та їх індекси
-        row = "|"
-        for char in visualization["encrypted_chars"]:
-            row += f" {char} |"
-        table_rows.append(row)
-
-        row = "|"
-        for idx in visualization["encrypted_indices"]:
-            row += f" {idx} |"
-        table_rows.append(row)
-
-        # Збираємо всі рядки в одну таблицю
-        return "\n".join(table_rows)
+        # p_i = (c_i - k_i) mod N; символи поза схемою залишаються без змін
+        codes = to_codepoints(encrypted)
+        c = self._to_indices(codes)
+        k = self._key_indices(key) if len(c) else c
+        decrypted, p, inside = self._apply(codes, c, key, k, -1)
+        decrypted_text = from_codepoints(decrypted)
+
+        if not visualize:
+            return decrypted_text
+
+        # Візуалізація зберігає масиви; рядки таблиці будуються лише для сторінки
+        visualization = DecryptionVisualization(
+            self, decrypted, p, k, codes, c, inside
+        )
+        return decrypted_text, visualization
+
+
+class DecryptionVisualization:
+    """
+    Дані візуалізації розшифрування ModAdditionCipher.
+
+    Зберігає масиви символів та індексів (ключ - без повторення) і формує
+    таблицю з шести рядків (символ та індекс для повідомлення, ключа і
+    шифрограми) тільки для запитаної сторінки стовпців.
+    """
+
+    def __init__(self, cipher, message_codes, message_indices, key_indices,
+                 encrypted_codes, encrypted_indices, inside):
+        self._cipher = cipher
+        self._columns = np.flatnonzero(inside)
+        self.message_codes = message_codes
+        self.message_indices = message_indices
+        self.key_indices = key_indices
+        self.encrypted_codes = encrypted_codes
+        self.encrypted_indices = encrypted_indices
+
+    def __len__(self):
+        return len(self._columns)
+
+    def page_count(self, page_size):
+        return max(1, -(-len(self) // page_size))
+
+    def page(self, number, page_size):
+        """
+        Повертає рядки таблиці для сторінки number (нумерація з 1).
+
+        :return: Список із шести рядків, кожен - список значень клітинок.
+        """
+        columns = self._columns[(number - 1) * page_size : number * page_size]
+        # Ключ зберігається без повторення: індекс ключа для позиції i - k[i mod len(k)]
+        key_indices = self.key_indices[columns % len(self.key_indices)] if len(columns) else columns
+        key_codes = self._cipher.symbols[key_indices]
+        return [
+            list(from_codepoints(self.message_codes[columns])),
+            self.message_indices[columns].tolist(),
+            list(from_codepoints(key_codes)),
+            key_indices.tolist(),
+            list(from_codepoints(self.encrypted_codes[columns])),
+            self.encrypted_indices[columns].tolist(),
+        ]
 
 
 class AdditiveCipher:
     def __init__(self):
-        self.scheme = {
-            "А": 0,
-            "Б": 1,
-            "В": 2,
-            "Г": 3,
-            "Ґ": 4,
-            "Д": 5,
-            "Е": 6,
-            "Є": 7,
-            "Ж": 8,
-            "З": 9,
-            "И": 10,
-            "І": 11,
-            "Ї": 12,
-            "Й": 13,
-            "К": 14,
-            "Л": 15,
-            "М": 16,
-            "Н": 17,
-            "О": 18,
-            "П": 19,
-            "Р": 20,
-            "С": 21,
-            "Т": 22,
-            "У": 23,
-            "Ф": 24,
-            "Х": 25,
-            "Ц": 26,
-            "Ч": 27,
-            "Ш": 28,
-            "Щ": 29,
-            "Ь": 30,
-            "Ю": 31,
-            "Я": 32,
-            " ": 33,  # Додаємо пробіл як символ алфавіту
-        }
-        self.reverse_scheme = {v: k for k, v in self.scheme.items()}
-        self.scheme_length = len(self.scheme)
+        # Спільний скомпільований алфавіт (labs.alphabet)
+        self.codec = UKRAINIAN
+        self.scheme = UKRAINIAN.scheme
+        self.reverse_scheme = UKRAINIAN.reverse
+        self.scheme_length = UKRAINIAN.size
+
+    def _to_indices(self, text):
+        """Перетворює текст на індекси схеми (-1 для символів поза схемою)."""
+        return self.codec.to_indices(text.upper())
+
+    def _to_text(self, indices):
+        """Перетворює індекси схеми на текст ("?" для -1 та індексів поза схемою)."""
+        inside = (indices >= 0) & (indices < self.scheme_length)
+        return self.codec.from_indices(np.where(inside, indices, -1), fill="?")
+
+    def _encrypt_indices(self, indices, carry=-1):
+        """
+        Сегментована кумулятивна сума за модулем m.
+
+        Сума скидається на маркерах -1; carry - останній зашифрований індекс
+        попереднього фрагмента (-1, якщо його немає).
+        """
+        m = self.scheme_length
+        values = np.concatenate(([carry], indices))
+        inside = values >= 0
+        total = np.cumsum(np.where(inside, values, 0))
+
+        # Для кожної позиції - значення суми на останньому маркері перед нею
+        markers = np.where(inside, -1, np.arange(len(values)))
+        last_marker = np.maximum.accumulate(markers)
+        base = np.where(last_marker >= 0, total[last_marker], 0)
+
+        encrypted = np.where(inside, (total - base) % m, -1)
+        return encrypted[1:]
+
+    def _decrypt_indices(self, indices, m, carry=-1):
+        """Маскована перша різниця за модулем m (carry - попередній індекс шифрограми)."""
+        if m == 0:
+            raise ValueError("Модуль не може дорівнювати нулю")
+        previous = np.concatenate(([carry], indices[:-1]))
+        linked = (indices >= 0) & (previous >= 0)
+        return np.where(linked, (indices - previous) % m, indices)
 
     def encrypt(self, message):
-        message = message.upper()
-
         if not message:
             return "", None
 
-        # Використовуємо довжину схеми як модуль
-        m = self.scheme_length
+        # Формула шифрування: X_i+1 = (X_i + X_i-1) mod m у межах сегментів схеми
+        encrypted_indices = self._encrypt_indices(self._to_indices(message))
 
-        # Перетворюємо символи повідомлення на індекси
-        message_indices = []
-        for char in message:
-            if char in self.scheme:
-                message_indices.append(self.scheme[char])
-            else:
-                message_indices.append(-1)
-
-        # Шифруємо повідомлення
-        encrypted_indices = []
-
-        # Перший символ залишаємо незмінним
-        if message_indices:
-            encrypted_indices.append(message_indices[0])
-
-        # Використовуємо індекси попередніх символів для шифрування
-        for i in range(1, len(message_indices)):
-            if message_indices[i] != -1 and encrypted_indices[i - 1] != -1:
-                # Формула шифрування: X_i+1 = (X_i + X_i-1) mod m
-                encrypted_index = (message_indices[i] + encrypted_indices[i - 1]) % m
-                encrypted_indices.append(encrypted_index)
-            else:
-                encrypted_indices.append(message_indices[i])
-
-        # Перетворюємо зашифровані індекси назад у символи
-        encrypted_message = ""
-        for idx in encrypted_indices:
-            if idx != -1:
-                encrypted_message += self.reverse_scheme.get(idx, "?")
-            else:
-                encrypted_message += "?"
-
-        return (encrypted_message, m)
+        # Використовуємо довжину схеми як модуль
+        return (self._to_text(encrypted_indices), self.scheme_length)
 
     def decrypt(self, encrypted_message, m):
-        encrypted_message = encrypted_message.upper()
-
         if not encrypted_message:
             return ""
 
-        # Перетворюємо символи зашифрованого повідомлення на індекси
-        encrypted_indices = []
-        for char in encrypted_message:
-            if char in self.scheme:
-                encrypted_indices.append(self.scheme[char])
-            else:
-                encrypted_indices.append(-1)
-
-        # Розшифровуємо повідомлення
-        decrypted_indices = []
-
-        # Перший символ залишаємо незмінним
-        if encrypted_indices:
-            decrypted_indices.append(encrypted_indices[0])
-
-        # Використовуємо формулу дешифрування для інших символів
-        for i in range(1, len(encrypted_indices)):
-            if encrypted_indices[i] != -1 and encrypted_indices[i - 1] != -1:
-                # Формула дешифрування: X_i = (C_i - C_i-1 + m) % m
-                decrypted_index = (
-                    encrypted_indices[i] - encrypted_indices[i - 1] + m
-                ) % m
-                decrypted_indices.append(decrypted_index)
-            else:
-                decrypted_indices.append(encrypted_indices[i])
-
-        # Перетворюємо розшифровані індекси назад у символи
-        decrypted_message = ""
-        for idx in decrypted_indices:
-            if idx != -1:
-                decrypted_message += self.reverse_scheme.get(idx, "?")
-            else:
-                decrypted_message += "?"
-
-        return decrypted_message
+        # Формула дешифрування: X_i = (C_i - C_i-1 + m) % m
+        decrypted_indices = self._decrypt_indices(self._to_indices(encrypted_message), m)
+
+        return self._to_text(decrypted_indices)
+
+    def encrypt_stream(self, chunks):
+        """
+        Шифрує потік фрагментів тексту (файл або ітерований об'єкт рядків).
+
+        Останній зашифрований індекс переноситься між фрагментами, тому
+        результат збігається з шифруванням усього тексту одразу.
+
+        :return: Генератор зашифрованих фрагментів
+        """
+        carry = -1
+        for chunk in chunks:
+            if not chunk:
+                continue
+            encrypted_indices = self._encrypt_indices(self._to_indices(chunk), carry)
+            carry = encrypted_indices[-1]
+            yield self._to_text(encrypted_indices)
+
+    def decrypt_stream(self, chunks, m=None):
+        """
+        Розшифровує потік фрагментів шифрограми.
+
+        :param m: Модуль (за замовчуванням довжина схеми)
+        :return: Генератор розшифрованих фрагментів
+        """
+        if m is None:
+            m = self.scheme_length
+        carry = -1
+        for chunk in chunks:
+            if not chunk:
+                continue
+            indices = self._to_indices(chunk)
+            decrypted_indices = self._decrypt_indices(indices, m, carry)
+            carry = indices[-1]
+            yield self._to_text(decrypted_indices)
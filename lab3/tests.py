@@ -1,3 +1,200 @@
+import random
+
+import numpy as np
 from django.test import TestCase
 
+from labs.alphabet import UKRAINIAN
+
+from .cipher import AdditiveCipher, ModAdditionCipher
+
 # Create your tests here.
+
+ALPHABET = "АБВГҐДЕЄЖЗИІЇЙКЛМНОПРСТУФХЦЧШЩЬЮЯ "
+SAMPLE_SYMBOLS = ALPHABET + "abc,!?ё١"
+
+
+def random_text(rng, length):
+    return "".join(rng.choice(SAMPLE_SYMBOLS) for _ in range(length))
+
+
+def reference_mod_addition(message, key, sign=1):
+    """Посимвольна еталонна реалізація: c_i = (p_i + sign * k_(i mod len(key))) mod N."""
+    result = []
+    for i, char in enumerate(message.upper()):
+        if char in ALPHABET:
+            shift = ALPHABET.index(key.upper()[i % len(key)])
+            result.append(ALPHABET[(ALPHABET.index(char) + sign * shift) % len(ALPHABET)])
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def reference_additive_encrypt(message):
+    """Посимвольна еталонна реалізація: X_i = (P_i + X_(i-1)) mod m у межах схеми."""
+    indices = [ALPHABET.find(char) for char in message.upper()]
+    encrypted = []
+    for i, index in enumerate(indices):
+        if i and index != -1 and encrypted[i - 1] != -1:
+            index = (index + encrypted[i - 1]) % len(ALPHABET)
+        encrypted.append(index)
+    return "".join(ALPHABET[index] if index != -1 else "?" for index in encrypted)
+
+
+def reference_additive_decrypt(encrypted_message, m):
+    indices = [ALPHABET.find(char) for char in encrypted_message.upper()]
+    decrypted = []
+    for i, index in enumerate(indices):
+        if i and index != -1 and indices[i - 1] != -1:
+            index = (index - indices[i - 1] + m) % m
+        decrypted.append(index)
+    return "".join(
+        ALPHABET[index] if 0 <= index < len(ALPHABET) else "?" for index in decrypted
+    )
+
+
+class ModAdditionCipherTests(TestCase):
+    def setUp(self):
+        self.rng = random.Random(16)
+        self.cipher = ModAdditionCipher()
+
+    def test_matches_reference(self):
+        for _ in range(200):
+            message = random_text(self.rng, self.rng.randint(0, 60))
+            key = "".join(self.rng.choice(ALPHABET) for _ in range(self.rng.randint(1, 9)))
+            with self.subTest(message=message, key=key):
+                encrypted = self.cipher.encrypt(message, key)
+                self.assertEqual(encrypted, reference_mod_addition(message, key))
+                self.assertEqual(
+                    self.cipher.decrypt(encrypted, key), reference_mod_addition(encrypted, key, -1)
+                )
+
+    def test_round_trip(self):
+        message = "ПРИВІТ, СВІТЕ! 123 abc"
+        encrypted = self.cipher.encrypt(message, "ключ")
+        self.assertEqual(self.cipher.decrypt(encrypted, "ключ"), message.upper())
+
+    def test_invalid_key(self):
+        with self.assertRaises(ValueError):
+            self.cipher.encrypt("ПРИВІТ", "")
+        with self.assertRaisesRegex(KeyError, "1"):
+            self.cipher.encrypt("ПРИВІТ", "К1")
+        # Символ ключа поза схемою допустимий там, де він не застосовується
+        self.assertEqual(self.cipher.encrypt("А,А,", "Б1"), "Б,Б,")
+        self.assertEqual(self.cipher.encrypt("", ""), "")
+
+
+class DecryptionVisualizationTests(TestCase):
+    def setUp(self):
+        self.cipher = ModAdditionCipher()
+
+    def test_plain_decrypt_has_no_visualization(self):
+        encrypted = self.cipher.encrypt("ПРИВІТ", "КЛЮЧ")
+        self.assertEqual(self.cipher.decrypt(encrypted, "КЛЮЧ"), "ПРИВІТ")
+
+    def test_pages(self):
+        message = "ПРИВІТ, СВІТЕ " * 10
+        encrypted = self.cipher.encrypt(message, "КЛЮЧ")
+        text, visualization = self.cipher.decrypt(encrypted, "КЛЮЧ", visualize=True)
+        self.assertEqual(text, message)
+        self.assertEqual(len(visualization), 130)
+        self.assertEqual(visualization.page_count(40), 4)
+
+        rows = visualization.page(1, 40)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0][:3], ["П", "Р", "И"])
+        self.assertEqual(rows[1][:3], [19, 20, 10])
+        # Кома (позиція 6) не входить у таблицю, але ключ для неї все одно витрачається
+        self.assertEqual(rows[2][:8], list("КЛЮЧКЛЧК"))
+        self.assertEqual(rows[4][:3], list(encrypted[:3]))
+        self.assertEqual(len(visualization.page(4, 40)[0]), 10)
+
+
+class ViewTests(TestCase):
+    def post_decrypt(self, **data):
+        encrypted = ModAdditionCipher().encrypt("ПРИВІТ СВІТЕ " * 20, "КЛЮЧ")
+        data.update(
+            form_type="modaddition_decrypt_form",
+            modaddition_encrypted_message=encrypted,
+            modaddition_encryption_key="КЛЮЧ",
+        )
+        return self.client.post("/lab3/", data)
+
+    def test_decrypt_table_is_paged(self):
+        response = self.post_decrypt()
+        self.assertEqual(response.context["modaddition_page_count"], 7)
+        self.assertEqual(response.context["modaddition_page"], 1)
+        self.assertEqual(len(response.context["modaddition_decrypted_table"][0]), 40)
+
+        response = self.post_decrypt(modaddition_page="99")
+        self.assertEqual(response.context["modaddition_page"], 7)
+        self.assertEqual(len(response.context["modaddition_decrypted_table"][0]), 20)
+
+    def test_invalid_page_falls_back_to_first(self):
+        for page in ("x", "1.5", "-3"):
+            with self.subTest(page=page):
+                response = self.post_decrypt(modaddition_page=page)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context["modaddition_page"], 1)
+
+
+class AdditiveCipherTests(TestCase):
+    def setUp(self):
+        self.rng = random.Random(4)
+        self.cipher = AdditiveCipher()
+
+    def test_segmented_prefix_sums_match_reference(self):
+        for _ in range(200):
+            message = random_text(self.rng, self.rng.randint(1, 60))
+            with self.subTest(message=message):
+                encrypted, m = self.cipher.encrypt(message)
+                self.assertEqual(m, len(ALPHABET))
+                self.assertEqual(encrypted, reference_additive_encrypt(message))
+                self.assertEqual(
+                    self.cipher.decrypt(encrypted, m), reference_additive_decrypt(encrypted, m)
+                )
+
+    def test_decrypt_uses_given_modulus(self):
+        for m in (7, 20, 40, -5):
+            message = random_text(self.rng, 40)
+            with self.subTest(m=m):
+                self.assertEqual(
+                    self.cipher.decrypt(message, m), reference_additive_decrypt(message, m)
+                )
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt("АБВ", 0)
+
+    def test_streams_match_single_call(self):
+        message = random_text(self.rng, 500)
+        cuts = sorted(self.rng.sample(range(1, 500), 6))
+        pieces = [message[i:j] for i, j in zip([0] + cuts, cuts + [500])]
+        encrypted, m = self.cipher.encrypt(message)
+        self.assertEqual("".join(self.cipher.encrypt_stream(pieces)), encrypted)
+
+        encrypted_pieces = [encrypted[i:j] for i, j in zip([0] + cuts, cuts + [500])]
+        self.assertEqual(
+            "".join(self.cipher.decrypt_stream(encrypted_pieces)), self.cipher.decrypt(encrypted, m)
+        )
+
+    def test_view_decrypts_encrypted_message(self):
+        response = self.client.post(
+            "/lab3/", {"form_type": "additive_encrypt_form", "additive_original_message": "ПРИВІТ СВІТЕ"}
+        )
+        encrypted = response.context["additive_encrypted_message"]
+        response = self.client.post(
+            "/lab3/", {"form_type": "additive_decrypt_form", "additive_encrypted_message": encrypted}
+        )
+        self.assertEqual(response.context["additive_decrypted_message"], "ПРИВІТ СВІТЕ")
+
+
+class AlphabetTests(TestCase):
+    def test_indices_round_trip(self):
+        indices = UKRAINIAN.to_indices("ПРИВІТ, світ")
+        self.assertEqual(indices[:3].tolist(), [19, 20, 10])
+        self.assertEqual(indices[6], -1)
+        self.assertEqual(UKRAINIAN.from_indices(indices, fill="?"), "ПРИВІТ? ????")
+        self.assertEqual(UKRAINIAN.from_indices(np.arange(len(ALPHABET))), ALPHABET)
+
+    def test_negative_index_requires_fill(self):
+        with self.assertRaises(ValueError):
+            UKRAINIAN.from_indices([0, -1])
+        self.assertEqual(UKRAINIAN.from_indices([]), "")
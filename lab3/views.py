@@ -1,6 +1,10 @@
 from django.shortcuts import render
 from .cipher import AdditiveCipher, ModAdditionCipher
 
+# Кількість стовпців таблиці візуалізації на одній сторінці
+VISUALIZATION_PAGE_SIZE = 40
+
+
 # Create your views here.
 
 
@@ -23,25 +27,26 @@ def lab3(request):
         elif form_type == "modaddition_decrypt_form":
             encrypted_message = request.POST.get("modaddition_encrypted_message", "")
             encryption_key = request.POST.get("modaddition_encryption_key", "")
-            decrypted_message, table_data = ModAdditionCipher().decrypt(
-                encrypted_message, encryption_key
+            decrypted_message, visualization = ModAdditionCipher().decrypt(
+                encrypted_message, encryption_key, visualize=True
             )
 
-            # Split by '|', strip whitespace, remove empty strings
-            cells = [
-                cell.strip()
-                for cell in table_data.strip().split("|")
-                if cell.strip() != ""
-            ]
-
-            # Group cells into rows
-            row_length = len(encrypted_message)
-            decrypted_table = [
-                cells[i : i + row_length] for i in range(0, len(cells), row_length)
-            ]
+            # Показуємо лише одну сторінку стовпців таблиці візуалізації
+            page_count = visualization.page_count(VISUALIZATION_PAGE_SIZE)
+            try:
+                page = int(request.POST.get("modaddition_page") or 1)
+            except (TypeError, ValueError):
+                page = 1
+            page = min(max(page, 1), page_count)
 
+            context["modaddition_encrypted_message"] = encrypted_message
+            context["modaddition_encryption_key"] = encryption_key
             context["modaddition_decrypted_message"] = decrypted_message
-            context["modaddition_decrypted_table"] = decrypted_table
+            context["modaddition_decrypted_table"] = visualization.page(
+                page, VISUALIZATION_PAGE_SIZE
+            )
+            context["modaddition_page"] = page
+            context["modaddition_page_count"] = page_count
 
             return render(request, "lab3.html", context)
 
@@ -1,4 +1,211 @@
+import base64
+import binascii
+import copy
+import functools
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _apply_matrix(rows, state):
+    """Множить матрицю над GF(2) (рядки - бітові маски) на вектор-стан."""
+    result = 0
+    for i, row in enumerate(rows):
+        result |= ((row & state).bit_count() & 1) << i
+    return result
+
+
+def _multiply_matrices(a, b):
+    """Добуток матриць над GF(2): рядок i результату - XOR рядків b під маскою a[i]."""
+    product = []
+    for row in a:
+        combined = 0
+        j = 0
+        while row:
+            if row & 1:
+                combined ^= b[j]
+            row >>= 1
+            j += 1
+        product.append(combined)
+    return tuple(product)
+
+
+@functools.lru_cache(maxsize=1024)
+def _companion_power(register_size, tap_mask, exponent):
+    """
+    Матриця переходу РСЛЗЗ у степені 2^exponent.
+
+    Рядок 0 супровідної матриці - маска відводів (новий біт), рядок i - зсув
+    біта i-1. Степені будуються повторним піднесенням до квадрата і кешуються.
+    """
+    if exponent == 0:
+        return (tap_mask,) + tuple(1 << (i - 1) for i in range(1, register_size))
+    half = _companion_power(register_size, tap_mask, exponent - 1)
+    return _multiply_matrices(half, half)
+
+
+@functools.lru_cache(maxsize=256)
+def _step_tables(register_size, tap_mask, width):
+    """
+    Таблиці переходу РСЛЗЗ на width кроків (як у табличному CRC).
+
+    Блок з width вихідних бітів лінійно залежить від стану, тому він дорівнює
+    XOR значень tables[j][байт j стану]. Новий стан - молодші біти
+    (state << width | блок).
+    """
+    full_mask = (1 << register_size) - 1
+
+    # Вихідні блоки для станів з одним одиничним бітом
+    basis = []
+    for i in range(register_size):
+        state, output = 1 << i, 0
+        for _ in range(width):
+            bit = (state & tap_mask).bit_count() & 1
+            state = ((state << 1) | bit) & full_mask
+            output = (output << 1) | bit
+        basis.append(output)
+    basis += [0] * (-register_size % 8)
+
+    tables = []
+    for j in range(0, register_size, 8):
+        table = [0] * 256
+        for value in range(1, 256):
+            low = value & -value
+            table[value] = table[value ^ low] ^ basis[j + low.bit_length() - 1]
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+@functools.lru_cache(maxsize=64)
+def _jump_matrix(register_size, tap_mask, bit_count):
+    """Матриця переходу РСЛЗЗ на bit_count кроків (добуток степенів 2^j)."""
+    rows = tuple(1 << i for i in range(register_size))
+    exponent = 0
+    while bit_count:
+        if bit_count & 1:
+            rows = _multiply_matrices(
+                _companion_power(register_size, tap_mask, exponent), rows
+            )
+        bit_count >>= 1
+        exponent += 1
+    return rows
+
+
+def _xor_file_chunk(polynomial, state, source_path, destination_path, offset, length):
+    """Шифрує фрагмент файлу з заданого стану регістра та записує його у відображений файл."""
+    cipher = LFSRCipher(polynomial)
+    cipher.keystream_cache = None
+    cipher.state = state
+    with open(source_path, "rb") as source:
+        source.seek(offset)
+        data = source.read(length)
+    with open(destination_path, "r+b") as destination:
+        with mmap.mmap(destination.fileno(), 0) as output:
+            output[offset : offset + length] = cipher._xor_keystream(data)
+    return length
+
+
+class KeystreamCache:
+    """
+    LRU-кеш байтів потоку ключів для пар (поліном, початковий стан).
+
+    Префікс потоку для ключа зберігається один раз і подовжується лише тоді,
+    коли надходить довше повідомлення: стан регістра після префікса
+    відновлюється з його останніх бітів. Загальний обсяг обмежено max_bytes;
+    найдавніше використані записи витісняються.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def keystream(self, cipher, start, length):
+        """
+        Повертає length байтів потоку ключів cipher, починаючи з байта start.
+
+        :return: Кортеж (байти потоку ключів, стан регістра після них) або None,
+                 якщо start + length перевищує бюджет кешу або start лежить за
+                 межами збереженого префікса (пропуск не заповнюється)
+        """
+        end = start + length
+        if end > self.max_bytes:
+            return None
+        key = (cipher.register_size, cipher.tap_mask, cipher.initial_register)
+        with self._lock:
+            entry = self._entries.get(key)
+            if start > (len(entry) if entry is not None else 0):
+                return None
+            if entry is not None and len(entry) >= end:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                # Промах: подовжуємо префікс з відновленого стану регістра
+                self.misses += 1
+                if entry is None:
+                    entry = self._entries[key] = bytearray()
+                generator = copy.copy(cipher)
+                generator.keystream_cache = None
+                generator.state = cipher._state_after(cipher.initial_register, entry)
+                extension = generator.keystream_bytes(end - len(entry))
+                entry += extension
+                self.size += len(extension)
+                self._entries.move_to_end(key)
+                self._evict()
+
+            tail = entry[max(0, end - (cipher.register_size + 7) // 8) : end]
+            state = cipher._state_after(cipher.initial_register, tail)
+            return bytes(entry[start:end]), state
+
+    def _evict(self):
+        """Витісняє найдавніше використані записи, доки обсяг перевищує бюджет."""
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        """Очищає кеш (статистика зберігається)."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """Статистика кешу: влучання, промахи, витіснення, кількість записів і байтів."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size,
+            }
+
+
 class LFSRCipher:
+    # Розмір фрагмента файлу для одного процесу (байти)
+    FILE_CHUNK_SIZE = 8 * 1024 * 1024
+
+    # Спільний кеш потоку ключів (None - без кешування)
+    keystream_cache = KeystreamCache()
+
+    # Розмір фрагмента для потокового шифрування (байти)
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    # Скільки байтів генерувати таблицями, перш ніж перейти до блочних кроків
+    TABLE_WARMUP_BYTES = 64
+
+    # На скільки байтів просувається регістр за один табличний крок
+    TABLE_STEP_BYTES = 32
+
     def __init__(self, polynomial, initial_state=None):
         """
         Ініціалізує шифр на основі РСЛЗЗ.
@@ -14,41 +221,213 @@ class LFSRCipher:
 
         # Якщо початковий стан не задано, заповнюємо одиницями
         if initial_state is None:
-            self.register = [1] * self.register_size
+            initial_state = [1] * self.register_size
         else:
             # Перевіряємо, що початковий стан правильної довжини
             if len(initial_state) != self.register_size:
                 raise ValueError(
                     f"Початковий стан повинен мати довжину {self.register_size}"
                 )
-            self.register = initial_state[:]
 
-    def _next_bit(self):
-        """Генерує наступний біт РСЛЗЗ та оновлює регістр."""
-        # Обчислюємо новий біт як XOR вказаних бітів згідно з поліномом
-        # Поліном x^10 + x^5 + x^4 + x^2 + 1 означає, що ми беремо біти
-        # з позицій 10-1=9, 5-1=4, 4-1=3, 2-1=1 та 0 (зсуви регістра)
-        feedback_bits = [
-            self.register[self.register_size - p - 1]
-            for p in self.polynomial
-            if p < self.register_size
+        # Регістр зберігається як ціле число: біт i = register[i]
+        self.full_mask = (1 << self.register_size) - 1
+        self.register = initial_state
+        self.initial_register = self.state
+
+        # Кількість бітів потоку ключів, згенерованих від початкового стану.
+        # Після прямого запису стану (register/state) позиція вже не задає
+        # стан, тому кеш потоку ключів не використовується до seek()
+        self.position = 0
+        self._synced = True
+
+        # Маска відводів: поліном x^10 + x^5 + x^4 + x^2 + 1 означає, що ми беремо
+        # біти з позицій 10-5-1=4, 10-4-1=5, 10-2-1=7 та 10-0-1=9.
+        # Повторені степені скасовуються (XOR)
+        self.tap_mask = 0
+        for p in self.polynomial:
+            if p < self.register_size:
+                self.tap_mask ^= 1 << (self.register_size - p - 1)
+
+        # Відстані відводів у вихідній послідовності: o_t = XOR_d o_(t-d)
+        self.tap_distances = [
+            i + 1 for i in range(self.register_size) if self.tap_mask >> i & 1
         ]
 
-        # Обчислюємо XOR всіх відібраних бітів
-        new_bit = 0
-        for bit in feedback_bits:
-            new_bit ^= bit
+    @property
+    def register(self):
+        """Поточний стан регістра у вигляді списку бітів."""
+        return [self.state >> i & 1 for i in range(self.register_size)]
 
-        # Зсуваємо регістр вправо (видаляємо останній біт)
-        # та вставляємо новий біт на початок
-        self.register.pop()
-        self.register.insert(0, new_bit)
+    @register.setter
+    def register(self, bits):
+        state = 0
+        for i, bit in enumerate(bits):
+            state |= (bit & 1) << i
+        self.state = state
+
+    @property
+    def state(self):
+        """Поточний стан регістра цілим числом (біт i = register[i])."""
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        self._state = value & self.full_mask
+        self._synced = False
+
+    def _next_bit(self):
+        """Генерує наступний біт РСЛЗЗ та оновлює регістр."""
+        # Новий біт - парність бітів регістра під маскою відводів
+        new_bit = (self.state & self.tap_mask).bit_count() & 1
+
+        # Зсуваємо регістр (останній біт виходить) та вставляємо новий біт на початок
+        self._state = ((self.state << 1) | new_bit) & self.full_mask
+        self.position += 1
 
         return new_bit
 
+    def _generate_bits(self, count):
+        """
+        Генерує count бітів потоку ключів одним цілим числом (перший біт - старший).
+
+        Послідовність розглядається разом з регістром як історією: біт i регістра
+        дорівнює o_(-1-i). Оскільки f(x)^(2^e) = f(x^(2^e)) над GF(2), то
+        o_t = XOR_d o_(t - 2^e * d) для t >= (2^e - 1) * max(d). За один крок
+        обчислюється до 2^e * min(d) бітів, тож крок росте разом з історією.
+        """
+        if count <= 0:
+            return 0
+        self.position += count
+        if not self.tap_distances:
+            # Без відводів у регістр вштовхуються лише нулі
+            self._state = (self.state << count) & self.full_mask
+            return 0
+
+        d_min, d_max = self.tap_distances[0], self.tap_distances[-1]
+
+        # Фаза 1: перші байти - табличними кроками, вони ж стають історією.
+        # Якщо відводи розкидані (d_max >> d_min), блочні кроки ростуть надто
+        # повільно, і таблиці генерують увесь потік
+        sequence = self.state
+        if d_max > 8 * d_min:
+            warmup = count // 8
+        else:
+            warmup = min(count // 8, self.TABLE_WARMUP_BYTES)
+        if warmup:
+            sequence = (sequence << (warmup * 8)) | int.from_bytes(
+                self._table_bytes(warmup), "big"
+            )
+        produced = warmup * 8
+        power = 1
+        while produced < count:
+            while (2 * power - 1) * d_max <= produced:
+                power *= 2
+            k = min(power * d_min, count - produced)
+
+            # Блок з k бітів: зсуви історії на 2^e * d відносно нових позицій
+            window = sequence & ((1 << (power * d_max)) - 1)
+            block = 0
+            for d in self.tap_distances:
+                block ^= window >> (power * d - k)
+            sequence = (sequence << k) | (block & ((1 << k) - 1))
+            produced += k
+
+        self._state = sequence & self.full_mask
+        return sequence & ((1 << count) - 1)
+
+    def _table_bytes(self, length):
+        """
+        Генерує length байтів потоку ключів табличними кроками (без оновлення position).
+
+        За один крок регістр просувається на TABLE_STEP_BYTES байтів, а блок
+        записується одразу в bytearray.
+        """
+        step = self.TABLE_STEP_BYTES
+        width = step * 8
+        tables = _step_tables(self.register_size, self.tap_mask, width)
+        full_mask = self.full_mask
+        state = self.state
+        keystream = bytearray(-(-length // step) * step)
+        for i in range(0, length, step):
+            block = 0
+            rest = state
+            for table in tables:
+                block ^= table[rest & 0xFF]
+                rest >>= 8
+            keystream[i : i + step] = block.to_bytes(step, "big")
+            state = ((state << width) | block) & full_mask
+
+        # Зайві байти останнього блоку відкидаються; стан - останні біти потоку
+        del keystream[length:]
+        self._state = self._state_after(self.state, keystream)
+        return keystream
+
+    def _state_after(self, state, keystream):
+        """Стан регістра після генерації байтів keystream зі стану state."""
+        length = len(keystream)
+        tail = keystream[max(0, length - (self.register_size + 7) // 8) :]
+        return ((state << (len(tail) * 8)) | int.from_bytes(tail, "big")) & self.full_mask
+
+    def state_at(self, bit_offset):
+        """
+        Обчислює стан регістра після bit_offset бітів від початкового стану.
+
+        Стан множиться на степені 2^j супровідної матриці для одиничних бітів
+        bit_offset: O(n^2 log k) бітових операцій замість k кроків регістра.
+        """
+        if bit_offset < 0:
+            raise ValueError("Зміщення не може бути від'ємним")
+        return self._advance(self.initial_register, bit_offset)
+
+    def _advance(self, state, bit_count):
+        """Стан регістра через bit_count кроків від state (степені супровідної матриці)."""
+        exponent = 0
+        while bit_count:
+            if bit_count & 1:
+                rows = _companion_power(self.register_size, self.tap_mask, exponent)
+                state = _apply_matrix(rows, state)
+            bit_count >>= 1
+            exponent += 1
+        return state
+
+    def seek(self, bit_offset):
+        """Переставляє генератор на біт bit_offset потоку ключів (від початкового стану)."""
+        self._state = self.state_at(bit_offset)
+        self.position = bit_offset
+        self._synced = True
+
     def generate_keystream(self, length):
         """Генерує потік ключів вказаної довжини."""
-        return [self._next_bit() for _ in range(length)]
+        bits = self._generate_bits(length)
+        return [int(bit) for bit in format(bits, f"0{length}b")] if length > 0 else []
+
+    def keystream_bytes(self, length):
+        """Генерує length байтів потоку ключів (біти впорядковано від старшого)."""
+        return self._generate_bits(length * 8).to_bytes(length, "big")
+
+    def _xor_keystream(self, data):
+        """Застосовує XOR потоку ключів до байтів data (одним цілим числом)."""
+        length = len(data)
+        keystream = self._cached_keystream(length)
+        if keystream is None:
+            keystream = self._generate_bits(length * 8)
+        return (int.from_bytes(data, "big") ^ keystream).to_bytes(length, "big")
+
+    def _cached_keystream(self, length):
+        """
+        Бере length байтів потоку ключів з keystream_cache (з вирівняної позиції).
+
+        :return: Потік ключів цілим числом або None, якщо кеш не застосовний
+        """
+        cache = self.keystream_cache
+        if cache is None or not length or not self._synced or self.position % 8:
+            return None
+        cached = cache.keystream(self, self.position // 8, length)
+        if cached is None:
+            return None
+        keystream, self._state = cached
+        self.position += length * 8
+        return int.from_bytes(keystream, "big")
 
     def encrypt(self, message):
         """
@@ -65,24 +444,8 @@ class LFSRCipher:
             # Якщо повідомлення вже в байтах, використовуємо його безпосередньо
             message_bytes = message
 
-        # Генеруємо потік ключів потрібної довжини
-        keystream_bits = self.generate_keystream(len(message_bytes) * 8)
-
-        # Перетворюємо потік бітів у байти
-        keystream_bytes = []
-        for i in range(0, len(keystream_bits), 8):
-            byte = 0
-            for j in range(8):
-                if i + j < len(keystream_bits):
-                    byte = (byte << 1) | keystream_bits[i + j]
-            keystream_bytes.append(byte)
-
-        # Шифруємо повідомлення, застосовуючи XOR до кожного байту
-        encrypted_bytes = [
-            (message_bytes[i] ^ keystream_bytes[i]) for i in range(len(message_bytes))
-        ]
-
-        return encrypted_bytes
+        # Шифруємо повідомлення, застосовуючи XOR до потоку ключів
+        return list(self._xor_keystream(message_bytes))
 
     def decrypt(self, encrypted_bytes, reset_state=True, return_bytes=False):
         """
@@ -93,26 +456,12 @@ class LFSRCipher:
         :param return_bytes: Якщо True, повертає результат як байти, інакше спробує конвертувати в рядок UTF-8
         :return: Розшифроване повідомлення у вигляді рядка або байтів
         """
-        # Скидаємо стан регістра, якщо потрібно
+        # Скидаємо стан регістра до початкового, якщо потрібно
         if reset_state:
-            self.__init__(self.polynomial, self.initial_state)
-
-        # Генеруємо потік ключів потрібної довжини
-        keystream_bits = self.generate_keystream(len(encrypted_bytes) * 8)
-
-        # Перетворюємо потік бітів у байти
-        keystream_bytes = []
-        for i in range(0, len(keystream_bits), 8):
-            byte = 0
-            for j in range(8):
-                if i + j < len(keystream_bits):
-                    byte = (byte << 1) | keystream_bits[i + j]
-            keystream_bytes.append(byte)
-
-        # Розшифровуємо повідомлення, застосовуючи XOR до кожного байту
-        decrypted_bytes = [
-            encrypted_bytes[i] ^ keystream_bytes[i] for i in range(len(encrypted_bytes))
-        ]
+            self.seek(0)
+
+        # Розшифровуємо повідомлення, застосовуючи XOR до потоку ключів
+        decrypted_bytes = self._xor_keystream(bytes(encrypted_bytes))
 
         # Повертаємо байти або спробуємо конвертувати в рядок
         if return_bytes:
@@ -126,6 +475,138 @@ class LFSRCipher:
                 )
                 return bytes(decrypted_bytes)
 
+    @staticmethod
+    def _chunks(source, chunk_size):
+        """Розбиває джерело байтів на фрагменти (memoryview) не довші за chunk_size."""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = [source]
+        elif hasattr(source, "read"):
+            source = iter(lambda read=source.read: read(chunk_size), b"")
+
+        for piece in source:
+            view = memoryview(piece)
+            for i in range(0, len(view), chunk_size):
+                yield view[i : i + chunk_size]
+
+    def encrypt_stream(self, source, chunk_size=None):
+        """
+        Шифрує потік байтів фрагментами, зберігаючи стан регістра між ними.
+
+        :param source: Байти, двійковий файл або ітерабельний об'єкт байтів
+        :param chunk_size: Розмір фрагмента (за замовчуванням STREAM_CHUNK_SIZE)
+        :return: Генератор зашифрованих фрагментів (bytes)
+        """
+        for chunk in self._chunks(source, chunk_size or self.STREAM_CHUNK_SIZE):
+            yield self._xor_keystream(chunk)
+
+    def decrypt_stream(self, source, chunk_size=None, reset_state=True):
+        """
+        Розшифровує потік байтів, зашифрований encrypt_stream.
+
+        :param reset_state: Якщо True, потік ключів починається з початкового стану
+        :return: Генератор розшифрованих фрагментів (bytes)
+        """
+        if reset_state:
+            self.seek(0)
+        yield from self.encrypt_stream(source, chunk_size)
+
+    @staticmethod
+    def to_transport(data, encoding="base64"):
+        """
+        Кодує шифрограму у текст для передачі (base64 або hex).
+
+        :param data: Байти або список байтів
+        """
+        data = bytes(data)
+        if encoding == "hex":
+            return data.hex()
+        return base64.b64encode(data).decode("ascii")
+
+    @staticmethod
+    def from_transport(text, encoding="base64"):
+        """
+        Декодує шифрограму з тексту (base64 або hex).
+
+        :raises ValueError: Якщо текст не є коректним кодуванням
+        """
+        text = text.strip()
+        try:
+            if encoding == "hex":
+                return bytes.fromhex(text)
+            return base64.b64decode(text, validate=True)
+        except binascii.Error as error:
+            raise ValueError(f"Некоректна шифрограма: {error}") from error
+
+    def decrypt_range(self, encrypted_bytes, byte_offset, return_bytes=True):
+        """
+        Розшифровує фрагмент шифрограми, що починається з байта byte_offset.
+
+        :param encrypted_bytes: Байти шифрограми, починаючи з byte_offset
+        :param byte_offset: Зміщення фрагмента від початку шифрограми
+        :param return_bytes: Якщо True, повертає байти, інакше рядок UTF-8
+        :return: Розшифрований фрагмент
+        """
+        self.seek(byte_offset * 8)
+        decrypted_bytes = self._xor_keystream(bytes(encrypted_bytes))
+        if return_bytes:
+            return decrypted_bytes
+        return decrypted_bytes.decode("utf-8")
+
+    def encrypt_file(self, source_path, destination_path, workers=None, chunk_size=None):
+        """
+        Шифрує файл паралельно у пулі процесів.
+
+        Файл ділиться на фрагменти; початковий стан регістра для кожного
+        фрагмента обчислюється наперед матрицею переходу, а результати
+        записуються у спільний відображений у пам'ять (mmap) вихідний файл.
+        Потік ключів продовжується з поточної позиції генератора.
+
+        :param workers: Кількість процесів (None - за кількістю ядер)
+        :param chunk_size: Розмір фрагмента у байтах
+        :return: Кількість оброблених байтів
+        """
+        chunk_size = chunk_size or self.FILE_CHUNK_SIZE
+        size = os.path.getsize(source_path)
+        with open(destination_path, "wb") as destination:
+            destination.truncate(size)
+
+        # Початкові стани фрагментів: кожен наступний - J * попередній
+        jump = _jump_matrix(self.register_size, self.tap_mask, chunk_size * 8)
+        offsets = range(0, size, chunk_size)
+        states = []
+        state = self.state
+        for _ in offsets:
+            states.append(state)
+            state = _apply_matrix(jump, state)
+
+        tasks = [
+            (self.polynomial, state, source_path, destination_path, offset,
+             min(chunk_size, size - offset))
+            for state, offset in zip(states, offsets)
+        ]
+        if len(tasks) > 1 and workers != 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_xor_file_chunk, *zip(*tasks)))
+        else:
+            for task in tasks:
+                _xor_file_chunk(*task)
+
+        self._state = self._advance(self._state, size * 8)
+        self.position += size * 8
+        return size
+
+    def decrypt_file(self, source_path, destination_path, workers=None,
+                     chunk_size=None, reset_state=True):
+        """
+        Розшифровує файл паралельно (див. encrypt_file).
+
+        :param reset_state: Якщо True, потік ключів починається з початкового стану
+        :return: Кількість оброблених байтів
+        """
+        if reset_state:
+            self.seek(0)
+        return self.encrypt_file(source_path, destination_path, workers, chunk_size)
+
     def display_register(self):
         """Виводить поточний стан регістра."""
         return "".join(map(str, self.register))
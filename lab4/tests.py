@@ -1,3 +1,308 @@
+import base64
+import os
+import tempfile
+
 from django.test import TestCase
 
+from .cipher import KeystreamCache, LFSRCipher
+
 # Create your tests here.
+
+# Поліноми з різною відстанню між відводами: блочні кроки, таблиці, дублікати
+POLYNOMIALS = [
+    [10, 5, 4, 2, 0],
+    [32, 22, 2, 1, 0],
+    [64, 63, 61, 60, 0],
+    [7, 3, 3, 0],
+    [5],
+]
+
+
+def reference_keystream(polynomial, initial_state, length):
+    """Побітова еталонна реалізація РСЛЗЗ (pop/insert, як у початковій версії)."""
+    register_size = max(polynomial)
+    register = list(initial_state)
+    bits = []
+    for _ in range(length):
+        new_bit = 0
+        for p in sorted(polynomial, reverse=True):
+            if p < register_size:
+                new_bit ^= register[register_size - p - 1]
+        register.pop()
+        register.insert(0, new_bit)
+        bits.append(new_bit)
+    return bits, register
+
+
+def pack_bits(bits):
+    return bytes(
+        int("".join(map(str, bits[i : i + 8])), 2) for i in range(0, len(bits), 8)
+    )
+
+
+def initial_state_for(polynomial):
+    size = max(polynomial)
+    return [(i * 7 + 3) % 5 % 2 for i in range(size)]
+
+
+class KeystreamTests(TestCase):
+    def setUp(self):
+        # Кеш вимкнено, щоб перевіряти саме генератор
+        self.cache = LFSRCipher.keystream_cache
+        LFSRCipher.keystream_cache = None
+
+    def tearDown(self):
+        LFSRCipher.keystream_cache = self.cache
+
+    def test_keystream_matches_per_bit_reference(self):
+        for polynomial in POLYNOMIALS:
+            state = initial_state_for(polynomial)
+            for length in (0, 1, 7, 8, 63, 500, 4099, 20000):
+                with self.subTest(polynomial=polynomial, length=length):
+                    expected, register = reference_keystream(polynomial, state, length)
+                    cipher = LFSRCipher(polynomial, state)
+                    self.assertEqual(cipher.generate_keystream(length), expected)
+                    self.assertEqual(cipher.register, register)
+                    self.assertEqual(cipher.position, length)
+
+    def test_keystream_bytes_are_packed_msb_first(self):
+        for polynomial in POLYNOMIALS:
+            state = initial_state_for(polynomial)
+            for length in (1, 3, 100, 3000):
+                with self.subTest(polynomial=polynomial, length=length):
+                    expected, _ = reference_keystream(polynomial, state, length * 8)
+                    cipher = LFSRCipher(polynomial, state)
+                    self.assertEqual(cipher.keystream_bytes(length), pack_bits(expected))
+
+    def test_single_steps_continue_block_generation(self):
+        polynomial = [10, 5, 4, 2, 0]
+        state = initial_state_for(polynomial)
+        expected, _ = reference_keystream(polynomial, state, 120)
+        cipher = LFSRCipher(polynomial, state)
+        bits = cipher.generate_keystream(100) + [cipher._next_bit() for _ in range(20)]
+        self.assertEqual(bits, expected)
+
+    def test_encrypt_decrypt_round_trip(self):
+        message = "Привіт, це тестове повідомлення!"
+        for polynomial in POLYNOMIALS[:3]:
+            state = initial_state_for(polynomial)
+            encrypted = LFSRCipher(polynomial, state).encrypt(message)
+            data = message.encode("utf-8")
+            expected, _ = reference_keystream(polynomial, state, len(data) * 8)
+            keystream = pack_bits(expected)
+            self.assertEqual(encrypted, [a ^ b for a, b in zip(data, keystream)])
+            self.assertEqual(LFSRCipher(polynomial, state).decrypt(encrypted), message)
+
+
+class SeekTests(TestCase):
+    def setUp(self):
+        self.cache = LFSRCipher.keystream_cache
+        LFSRCipher.keystream_cache = None
+
+    def tearDown(self):
+        LFSRCipher.keystream_cache = self.cache
+
+    def test_seek_matches_sequential_generation(self):
+        for polynomial in POLYNOMIALS:
+            state = initial_state_for(polynomial)
+            sequential = LFSRCipher(polynomial, state)
+            keystream = sequential.generate_keystream(3000)
+            for offset in (0, 1, 9, 64, 1000, 2999):
+                with self.subTest(polynomial=polynomial, offset=offset):
+                    cipher = LFSRCipher(polynomial, state)
+                    cipher.seek(offset)
+                    self.assertEqual(cipher.position, offset)
+                    self.assertEqual(cipher.generate_keystream(3000 - offset), keystream[offset:])
+                    self.assertEqual(cipher.state, sequential.state)
+
+    def test_decrypt_range_matches_full_decryption(self):
+        polynomial = [32, 22, 2, 1, 0]
+        state = initial_state_for(polynomial)
+        data = os.urandom(5000)
+        encrypted = bytes(LFSRCipher(polynomial, state).encrypt(data))
+        for start, end in ((0, 10), (123, 456), (4990, 5000)):
+            with self.subTest(start=start):
+                cipher = LFSRCipher(polynomial, state)
+                self.assertEqual(cipher.decrypt_range(encrypted[start:end], start), data[start:end])
+
+    def test_state_at_matches_reference_register(self):
+        for polynomial in POLYNOMIALS:
+            state = initial_state_for(polynomial)
+            for offset in (0, 1, 100, 12_345):
+                with self.subTest(polynomial=polynomial, offset=offset):
+                    _, register = reference_keystream(polynomial, state, offset)
+                    cipher = LFSRCipher(polynomial, state)
+                    cipher.seek(offset)
+                    self.assertEqual(cipher.register, register)
+
+    def test_negative_offset(self):
+        with self.assertRaises(ValueError):
+            LFSRCipher([10, 5, 4, 2, 0]).seek(-1)
+
+
+class FileTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, "source")
+        self.encrypted = os.path.join(self.directory.name, "encrypted")
+        self.decrypted = os.path.join(self.directory.name, "decrypted")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_encrypt_file_matches_encrypt(self):
+        polynomial = [10, 5, 4, 2, 0]
+        state = initial_state_for(polynomial)
+        data = os.urandom(100_003)
+        with open(self.source, "wb") as source:
+            source.write(data)
+        expected = bytes(LFSRCipher(polynomial, state).encrypt(data))
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                cipher = LFSRCipher(polynomial, state)
+                cipher.encrypt_file(self.source, self.encrypted, workers, chunk_size=16_384)
+                with open(self.encrypted, "rb") as encrypted:
+                    self.assertEqual(encrypted.read(), expected)
+                self.assertEqual(cipher.position, len(data) * 8)
+                self.assertEqual(cipher.state, cipher.state_at(len(data) * 8))
+
+                cipher.decrypt_file(self.encrypted, self.decrypted, workers, chunk_size=10_000)
+                with open(self.decrypted, "rb") as decrypted:
+                    self.assertEqual(decrypted.read(), data)
+
+    def test_empty_file(self):
+        open(self.source, "wb").close()
+        LFSRCipher([10, 5, 4, 2, 0]).encrypt_file(self.source, self.encrypted)
+        self.assertEqual(os.path.getsize(self.encrypted), 0)
+
+    def test_encrypt_file_continues_from_current_position(self):
+        polynomial = [32, 22, 2, 1, 0]
+        state = initial_state_for(polynomial)
+        data = os.urandom(50_000)
+        with open(self.source, "wb") as source:
+            source.write(data[1000:])
+        expected = bytes(LFSRCipher(polynomial, state).encrypt(data))[1000:]
+
+        cipher = LFSRCipher(polynomial, state)
+        cipher.seek(8000)
+        cipher.encrypt_file(self.source, self.encrypted, workers=2, chunk_size=8192)
+        with open(self.encrypted, "rb") as encrypted:
+            self.assertEqual(encrypted.read(), expected)
+
+
+
+class TableStepTests(TestCase):
+    def test_table_bytes_match_per_bit_reference(self):
+        for polynomial in POLYNOMIALS:
+            state = initial_state_for(polynomial)
+            for length in (1, 7, 31, 32, 33, 1000):
+                with self.subTest(polynomial=polynomial, length=length):
+                    expected, register = reference_keystream(polynomial, state, length * 8)
+                    cipher = LFSRCipher(polynomial, state)
+                    self.assertEqual(bytes(cipher._table_bytes(length)), pack_bits(expected))
+                    self.assertEqual(cipher.register, register)
+
+    def test_table_bytes_continue_bit_generation(self):
+        polynomial = [64, 63, 61, 60, 0]
+        state = initial_state_for(polynomial)
+        expected, _ = reference_keystream(polynomial, state, 8 * 100 + 3)
+        cipher = LFSRCipher(polynomial, state)
+        bits = cipher.generate_keystream(3)
+        table = cipher._table_bytes(100)
+        self.assertEqual(bits, expected[:3])
+        self.assertEqual(bytes(table), pack_bits(expected[3:]))
+
+
+class StreamTests(TestCase):
+    def test_stream_matches_encrypt(self):
+        polynomial = [10, 5, 4, 2, 0]
+        data = os.urandom(20_000)
+        expected = bytes(LFSRCipher(polynomial).encrypt(data))
+        pieces = [data[:7], data[7:12_345], data[12_345:]]
+        encrypted = b"".join(LFSRCipher(polynomial).encrypt_stream(pieces, chunk_size=1000))
+        self.assertEqual(encrypted, expected)
+        self.assertEqual(b"".join(LFSRCipher(polynomial).decrypt_stream(expected)), data)
+
+    def test_transport_round_trip(self):
+        data = os.urandom(100)
+        self.assertEqual(LFSRCipher.from_transport(LFSRCipher.to_transport(data)), data)
+        self.assertEqual(LFSRCipher.from_transport(LFSRCipher.to_transport(data, "hex"), "hex"), data)
+        with self.assertRaises(ValueError):
+            LFSRCipher.from_transport("@@")
+
+
+class KeystreamCacheTests(TestCase):
+    def setUp(self):
+        self.cache = LFSRCipher.keystream_cache
+        LFSRCipher.keystream_cache = KeystreamCache(max_bytes=4096)
+
+    def tearDown(self):
+        LFSRCipher.keystream_cache = self.cache
+
+    def test_repeated_decrypt_hits_cache(self):
+        polynomial, state = [10, 5, 4, 2, 0], [1, 0] * 5
+        encrypted = LFSRCipher(polynomial, state).encrypt("повідомлення")
+        for _ in range(3):
+            self.assertEqual(LFSRCipher(polynomial, state).decrypt(encrypted), "повідомлення")
+        stats = LFSRCipher.keystream_cache.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 3)
+
+    def test_register_write_bypasses_cache(self):
+        polynomial, state = [10, 5, 4, 2, 0], [1, 0] * 5
+        other = [0, 1, 1, 0, 0, 1, 1, 1, 0, 1]
+        LFSRCipher(polynomial, state).encrypt(b"hello" * 10)
+
+        cipher = LFSRCipher(polynomial, state)
+        cipher.register = other
+        expected, _ = reference_keystream(polynomial, other, 40)
+        keystream = pack_bits(expected)
+        self.assertEqual(cipher.encrypt(b"hello"), [a ^ b for a, b in zip(b"hello", keystream)])
+
+    def test_seek_does_not_fill_gap(self):
+        cipher = LFSRCipher([10, 5, 4, 2, 0])
+        cipher.decrypt_range(b"x" * 10, 1_000_000)
+        self.assertEqual(LFSRCipher.keystream_cache.stats()["bytes"], 0)
+
+    def test_budget_evicts_least_recently_used(self):
+        for i in range(1, 4):
+            LFSRCipher([10, 5, 4, 2, 0], [1] * 8 + [i >> 1 & 1, i & 1]).encrypt(bytes(2000 + i))
+        stats = LFSRCipher.keystream_cache.stats()
+        self.assertLessEqual(stats["bytes"], 4096)
+        self.assertGreater(stats["evictions"], 0)
+
+    def test_cached_keystream_matches_generator(self):
+        polynomial, state = [32, 22, 2, 1, 0], initial_state_for([32, 22, 2, 1, 0])
+        data = os.urandom(3000)
+        first = LFSRCipher(polynomial, state).encrypt(data)
+        cached = LFSRCipher(polynomial, state)
+        second = cached.encrypt(data[:1000]) + cached.encrypt(data[1000:])
+        self.assertEqual(second, first)
+        self.assertGreater(LFSRCipher.keystream_cache.stats()["hits"], 0)
+
+        expected, register = reference_keystream(polynomial, state, len(data) * 8)
+        self.assertEqual(first, [a ^ b for a, b in zip(data, pack_bits(expected))])
+        self.assertEqual(cached.register, register)
+
+
+
+class ViewTests(TestCase):
+    polynomial = "[10, 5, 4, 2, 0]"
+    state = "[1, 0, 1, 0, 1, 0, 1, 0, 1, 0]"
+
+    def post(self, **data):
+        data.update(lsfr_polynomial=self.polynomial, lsfr_initial_state=self.state)
+        return self.client.post("/lab4/", data)
+
+    def test_base64_round_trip(self):
+        response = self.post(form_type="lsfr_encrypt_form", lsfr_original_message="Привіт")
+        encrypted = response.context["lsfr_encrypted_message"]
+        response = self.post(form_type="lsfr_decrypt_form", lsfr_encrypted_message=encrypted)
+        self.assertEqual(response.context["lsfr_decrypted_message"], "Привіт")
+
+    def test_legacy_list_ciphertext(self):
+        response = self.post(form_type="lsfr_encrypt_form", lsfr_original_message="Привіт")
+        legacy = str(list(base64.b64decode(response.context["lsfr_encrypted_message"])))
+        response = self.post(form_type="lsfr_decrypt_form", lsfr_encrypted_message=legacy)
+        self.assertEqual(response.context["lsfr_decrypted_message"], "Привіт")
@@ -13,22 +13,27 @@ def lab4(request):
             message = request.POST.get("lsfr_original_message", "")
             polynomial = request.POST.get("lsfr_polynomial", "")
             initial_state = request.POST.get("lsfr_initial_state", "")
-            encrypted_message = LFSRCipher(
+            encrypted_bytes = LFSRCipher(
                 ast.literal_eval(polynomial), ast.literal_eval(initial_state)
             ).encrypt(message)
 
             # Add both original and processed messages to context
             context["lsfr_original_message"] = message
-            context["lsfr_encrypted_message"] = encrypted_message
+            context["lsfr_encrypted_message"] = LFSRCipher.to_transport(encrypted_bytes)
 
             return render(request, "lab4.html", context)
         elif form_type == "lsfr_decrypt_form":
             encrypted_message = request.POST.get("lsfr_encrypted_message", "")
             polynomial = request.POST.get("lsfr_polynomial", "")
             initial_state = request.POST.get("lsfr_initial_state", "")
+            # Шифрограма передається у base64; старий формат - список байтів
+            if encrypted_message.lstrip().startswith("["):
+                encrypted_bytes = ast.literal_eval(encrypted_message)
+            else:
+                encrypted_bytes = LFSRCipher.from_transport(encrypted_message)
             decrypted_bytes = LFSRCipher(
                 ast.literal_eval(polynomial), ast.literal_eval(initial_state)
-            ).decrypt(ast.literal_eval(encrypted_message), return_bytes=True)
+            ).decrypt(encrypted_bytes, return_bytes=True)
             decrypted_message = decrypted_bytes.decode("utf-8")
 
             context["lsfr_decrypted_message"] = decrypted_message
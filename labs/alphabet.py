@@ -0,0 +1,76 @@
+import numpy as np
+
+
+def to_codepoints(text):
+    """Перетворює рядок на масив кодів символів (UTF-32)."""
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+
+def from_codepoints(codes):
+    """Перетворює масив кодів символів назад у рядок."""
+    data = np.ascontiguousarray(codes, dtype=np.uint32).tobytes()
+    return data.decode("utf-32-le", "surrogatepass")
+
+
+class Alphabet:
+    """
+    Скомпільований алфавіт: символ <-> індекс.
+
+    Будується один раз і спільно використовується шифрами. Містить словники
+    та щільні масиви NumPy для векторного перетворення.
+    """
+
+    def __init__(self, letters):
+        """
+        :param letters: Рядок символів алфавіту у порядку їх індексів
+        """
+        self.letters = letters
+        self.size = len(letters)
+
+        # Словники символ -> індекс та індекс -> символ
+        self.scheme = {char: index for index, char in enumerate(letters)}
+        self.reverse = dict(enumerate(letters))
+
+        # Масиви NumPy: індекс -> код символу та код символу -> індекс (-1 поза алфавітом)
+        self.symbols = to_codepoints(letters).copy()
+        self.lookup = np.full(int(self.symbols.max()) + 1, -1, dtype=np.int64)
+        self.lookup[self.symbols] = np.arange(self.size)
+        self.symbols.setflags(write=False)
+        self.lookup.setflags(write=False)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, char):
+        return char in self.scheme
+
+    def codes_to_indices(self, codes):
+        """Перетворює коди символів на індекси (-1 для символів поза алфавітом)."""
+        indices = np.full(len(codes), -1, dtype=np.int64)
+        known = codes < len(self.lookup)
+        indices[known] = self.lookup[codes[known]]
+        return indices
+
+    def to_indices(self, text):
+        """Перетворює текст на масив індексів (-1 для символів поза алфавітом)."""
+        return self.codes_to_indices(to_codepoints(text))
+
+    def from_indices(self, indices, fill=None):
+        """
+        Перетворює масив індексів назад у текст.
+
+        :param fill: Символ для індексу -1; якщо None, усі індекси мають бути коректними
+        :raises ValueError: Якщо fill не задано, а серед індексів є від'ємні
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if fill is None:
+            # Без перевірки -1 мовчки перетворився б на останній символ алфавіту
+            if len(indices) and indices.min() < 0:
+                raise ValueError("Від'ємний індекс символу без символу заповнення")
+            return from_codepoints(self.symbols[indices])
+        codes = np.where(indices >= 0, self.symbols[indices], ord(fill))
+        return from_codepoints(codes)
+
+
+# Український алфавіт з пробілом (34 символи), спільний для шифрів лабораторних 2-3
+UKRAINIAN = Alphabet("АБВГҐДЕЄЖЗИІЇЙКЛМНОПРСТУФХЦЧШЩЬЮЯ ")